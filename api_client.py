@@ -1,25 +1,126 @@
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from email.utils import parsedate_to_datetime
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from google_auth_httplib2 import AuthorizedHttp
 import os
 import logging
 import config
+import metrics
+from models import parse_iso
 
 SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+EVENT_FIELDS = 'id,status,summary,description,start,end'
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per second with bursts of up to `burst`."""
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, count=1):
+        """Take `count` tokens, sleeping until the bucket has refilled enough to cover them."""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= count
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+def event_start_utc(event):
+    """Return an event's start as an aware UTC datetime, for ordering events across calendars."""
+    if 'dateTime' in event['start']:
+        return parse_iso(event['start']['dateTime']).astimezone(timezone.utc)
+    return parse_iso(event['start']['date']).replace(tzinfo=timezone.utc)
+
+
 class TodoistClient:
-    def __init__(self, api_token):
+    def __init__(self, api_token, pool_size=4, max_retries=5, backoff_factor=0.5, rate_limiter=None):
+        """
+        pool_size: Number of keep-alive connections held by the session.
+        max_retries: Retries for 429/5xx responses and connection errors before giving up.
+        backoff_factor: Base delay in seconds, doubled on each retry unless the server sends Retry-After.
+        rate_limiter: Optional RateLimiter shared by every request this client sends.
+        """
         self.api_token = api_token
         self.base_url = "https://api.todoist.com/rest/v2"
         self.headers = {"Authorization": f"Bearer {api_token}"}
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = rate_limiter
+        self.retry_count = 0
+        self.retry_wait_seconds = 0.0
+        
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+    
+    def _retry_after(self, response):
+        """Return the delay requested by a Retry-After header, in seconds, or None."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    
+    def _request(self, method, url, **kwargs):
+        """Send a request on the pooled session, retrying transient failures with backoff."""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, timeout=30, **kwargs)
+                metrics.count('api_calls', service='todoist')
+                metrics.count('api_bytes', len(response.content), service='todoist')
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                reason = str(e)
+                delay = self.backoff_factor * (2 ** attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+                reason = f"HTTP {response.status_code}"
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self.backoff_factor * (2 ** attempt)
+            
+            logger.warning(f"Todoist request failed ({reason}), retrying in {delay:.1f}s "
+                           f"({attempt + 1}/{self.max_retries})")
+            self.retry_count += 1
+            self.retry_wait_seconds += delay
+            metrics.count('api_retries', service='todoist')
+            time.sleep(delay)
     
     def get_tasks(self, filter_string=None):
         """Fetch tasks from Todoist."""
@@ -28,8 +129,7 @@ class TodoistClient:
         if filter_string:
             params['filter'] = filter_string
         
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
+        response = self._request('GET', url, params=params)
         return response.json()
     
     def get_task_by_date(self, date_obj):
@@ -38,11 +138,112 @@ class TodoistClient:
         return self.get_tasks(filter_string=f"due: {date_str}")
 
 
+class TodoistSyncClient(TodoistClient):
+    """Todoist client that keeps a local task cache current through the incremental Sync API."""
+    def __init__(self, api_token, cache_file, **kwargs):
+        super().__init__(api_token, **kwargs)
+        self.sync_url = "https://api.todoist.com/sync/v9/sync"
+        self.cache_file = cache_file
+        self.sync_token = '*'
+        self.items = {}
+        self._synced = False
+        self._load_cache()
+    
+    def _load_cache(self):
+        """Load the cached tasks and sync token from the previous run."""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+            self.items = cache['items']
+            self.sync_token = cache['sync_token']
+            logger.info(f"Loaded {len(self.items)} cached tasks from {self.cache_file}")
+        except Exception as e:
+            logger.warning(f"Failed to load Todoist cache, running a full sync: {e}")
+            self.items = {}
+            self.sync_token = '*'
+    
+    def _save_cache(self):
+        """Write the task cache and sync token, replacing the old file atomically."""
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({'sync_token': self.sync_token, 'items': self.items}, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.error(f"Failed to save Todoist cache: {e}")
+    
+    def sync(self):
+        """Fetch task changes since the stored sync token and apply them to the cache."""
+        response = self._request('POST', self.sync_url, data={
+            'sync_token': self.sync_token,
+            'resource_types': '["items"]'
+        })
+        result = response.json()
+        
+        if result.get('full_sync'):
+            self.items = {}
+        
+        changed = result.get('items', [])
+        for item in changed:
+            if item.get('is_deleted') or item.get('checked'):
+                self.items.pop(item['id'], None)
+            else:
+                self.items[item['id']] = item
+        
+        self.sync_token = result['sync_token']
+        self._synced = True
+        self._save_cache()
+        logger.info(f"Todoist sync: {len(changed)} changed, {len(self.items)} tasks cached")
+    
+    def get_tasks(self, filter_string=None):
+        """Return all open tasks from the cache, syncing once per client."""
+        if filter_string:
+            raise ValueError("Filter queries are not supported by the Sync API backend")
+        if not self._synced:
+            self.sync()
+        return list(self.items.values())
+    
+    def get_task_by_date(self, date_obj):
+        """Get cached tasks due on a specific date."""
+        date_str = date_obj.strftime('%Y-%m-%d')
+        return [task for task in self.get_tasks()
+                if (task.get('due') or {}).get('date', '')[:10] == date_str]
+
+
+class CountingHttp:
+    """Wraps an httplib2-style client to count requests and response bytes for a service."""
+    def __init__(self, http, service):
+        self.http = http
+        self.service = service
+    
+    def request(self, *args, **kwargs):
+        response, content = self.http.request(*args, **kwargs)
+        metrics.count('api_calls', service=self.service)
+        metrics.count('api_bytes', len(content or b''), service=self.service)
+        return response, content
+    
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+
 class GoogleCalendarClient:
-    def __init__(self):
+    def __init__(self, rate_limiter=None):
         self.creds = None
+        self.rate_limiter = rate_limiter
         self._authenticate()
-        self.service = build('calendar', 'v3', credentials=self.creds)
+        self.service = self._build_service()
+    
+    def _build_service(self):
+        http = CountingHttp(AuthorizedHttp(self.creds, http=build_http()), 'google')
+        return build('calendar', 'v3', http=http)
+    
+    def _execute(self, request, count=1):
+        """Execute an API request (or batch of `count` requests) under the rate limiter."""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(count)
+        return request.execute()
     
     def _authenticate(self):
         """Authenticate with Google Calendar API with proper token refresh handling."""
@@ -94,38 +295,172 @@ class GoogleCalendarClient:
         except Exception as e:
             logger.error(f"Failed to save credentials: {e}")
     
+    def _list_params(self, calendar_id, start_date, end_date):
+        """Build events().list parameters for a ranged, field-trimmed query."""
+        return {
+            'calendarId': calendar_id,
+            'timeMin': start_date.isoformat() + 'T00:00:00Z',
+            'timeMax': end_date.isoformat() + 'T23:59:59Z',
+            'singleEvents': True,
+            'orderBy': 'startTime',
+            'maxResults': 2500,
+            'fields': f'nextPageToken,items({EVENT_FIELDS})'
+        }
+    
+    def iter_events(self, start_date, end_date, calendar_id='primary'):
+        """Yield events between start_date and end_date, requesting each page only as it is consumed."""
+        params = self._list_params(calendar_id, start_date, end_date)
+        
+        while True:
+            try:
+                events_result = self._execute(self.service.events().list(**params))
+            except HttpError as error:
+                if error.resp.status == 401:
+                    logger.error("Authentication failed. Token may be revoked or expired.")
+                    logger.info("Attempting to re-authenticate...")
+                    self._revoke_and_reauth()
+                    continue
+                else:
+                    logger.error(f"An error occurred: {error}")
+                    raise
+            
+            yield from events_result.get('items', [])
+            
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                return
+            params['pageToken'] = page_token
+    
     def get_events(self, start_date, end_date, calendar_id='primary'):
-        """Fetch events between start_date and end_date."""
-        start_time = start_date.isoformat() + 'T00:00:00Z'
-        end_time = end_date.isoformat() + 'T23:59:59Z'
+        """Fetch all events between start_date and end_date."""
+        return list(self.iter_events(start_date, end_date, calendar_id))
+    
+    def iter_events_multi(self, calendar_ids, start_date, end_date, required=('primary',)):
+        """
+        Fetch several calendars with one batched HTTP request per page round and
+        yield their events merged by start time. Each event is tagged with the
+        'calendar_id' it came from. A failing calendar listed in required raises
+        its error once the batch has run; other calendars that fail are logged
+        and skipped.
+        """
+        results = {calendar_id: [] for calendar_id in calendar_ids}
+        page_tokens = {calendar_id: None for calendar_id in calendar_ids}
         
-        try:
-            events_result = self.service.events().list(
-                calendarId=calendar_id,
-                timeMin=start_time,
-                timeMax=end_time,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+        while page_tokens:
+            next_tokens = {}
+            auth_failed = []
+            errors = []
             
-            return events_result.get('items', [])
+            def collect(request_id, response, exception):
+                if exception is not None:
+                    if isinstance(exception, HttpError) and exception.resp.status == 401:
+                        auth_failed.append(request_id)
+                    elif request_id in required:
+                        errors.append(exception)
+                    else:
+                        logger.warning(f"Failed to fetch calendar {request_id}: {exception}")
+                    return
+                for event in response.get('items', []):
+                    event['calendar_id'] = request_id
+                    results[request_id].append(event)
+                if response.get('nextPageToken'):
+                    next_tokens[request_id] = response['nextPageToken']
+            
+            batch = self.service.new_batch_http_request(callback=collect)
+            for calendar_id, page_token in page_tokens.items():
+                params = self._list_params(calendar_id, start_date, end_date)
+                if page_token:
+                    params['pageToken'] = page_token
+                batch.add(self.service.events().list(**params), request_id=calendar_id)
+            self._execute(batch, count=len(page_tokens))
+            
+            if errors:
+                logger.error(f"An error occurred: {errors[0]}")
+                raise errors[0]
+            
+            if auth_failed:
+                logger.error("Authentication failed. Token may be revoked or expired.")
+                logger.info("Attempting to re-authenticate...")
+                self._revoke_and_reauth()
+                for calendar_id in auth_failed:
+                    next_tokens[calendar_id] = page_tokens[calendar_id]
+            
+            page_tokens = next_tokens
         
+        merged = [event for events in results.values() for event in events]
+        merged.sort(key=event_start_utc)
+        yield from merged
+    
+    def sync_events(self, store, calendar_id='primary', start_date=None, end_date=None):
+        """
+        Bring a local EventStore up to date, fetching only changes once a sync token exists.
+        The first full sync is limited to start_date..end_date when given, so it does not
+        download the calendar's whole history. A later request outside the synced window
+        triggers a new full sync for the requested one.
+        """
+        sync_token = store.get_sync_token(calendar_id)
+        window = (start_date, end_date) if start_date and end_date else None
+        
+        stored_window = store.get_window(calendar_id)
+        if sync_token and window and stored_window and not (
+                stored_window[0] <= start_date and end_date <= stored_window[1]):
+            logger.info("Requested range is outside the synced window, running a full sync...")
+            store.clear(calendar_id)
+            sync_token = None
+        
+        try:
+            events, next_sync_token = self._list_changes(calendar_id, sync_token, None if sync_token else window)
         except HttpError as error:
-            if error.resp.status == 401:
+            if error.resp.status == 410:
+                logger.info("Sync token expired, running a full sync...")
+                store.clear(calendar_id)
+                return self.sync_events(store, calendar_id, start_date, end_date)
+            elif error.resp.status == 401:
                 logger.error("Authentication failed. Token may be revoked or expired.")
                 logger.info("Attempting to re-authenticate...")
                 self._revoke_and_reauth()
-                return self.get_events(start_date, end_date, calendar_id)
+                return self.sync_events(store, calendar_id, start_date, end_date)
             else:
                 logger.error(f"An error occurred: {error}")
                 raise
+        
+        store.apply_changes(calendar_id, events, next_sync_token, replace=sync_token is None, window=window)
+        return len(events)
+    
+    def _list_changes(self, calendar_id, sync_token=None, window=None):
+        """
+        List every page of events (or changes since sync_token) and return them with the
+        next sync token. window limits a full sync to a (start_date, end_date) range; the
+        API rejects timeMin/timeMax together with a sync token.
+        """
+        params = {
+            'calendarId': calendar_id,
+            'singleEvents': True,
+            'maxResults': 2500,
+            'fields': f'nextPageToken,nextSyncToken,items({EVENT_FIELDS})'
+        }
+        if sync_token:
+            params['syncToken'] = sync_token
+        elif window:
+            params['timeMin'] = window[0].isoformat() + 'T00:00:00Z'
+            params['timeMax'] = window[1].isoformat() + 'T23:59:59Z'
+        
+        events = []
+        while True:
+            events_result = self._execute(self.service.events().list(**params))
+            events.extend(events_result.get('items', []))
+            
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                return events, events_result.get('nextSyncToken')
+            params['pageToken'] = page_token
     
     def _revoke_and_reauth(self):
         """Revoke current credentials and re-authenticate."""
         if os.path.exists(config.GOOGLE_TOKEN_FILE):
             os.remove(config.GOOGLE_TOKEN_FILE)
         self._authenticate()
-        self.service = build('calendar', 'v3', credentials=self.creds)
+        self.service = self._build_service()
     
     def get_events_for_day(self, date_obj):
         """Get events for a specific day."""
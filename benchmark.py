@@ -0,0 +1,289 @@
+"""
+Offline benchmark for the planner pipeline.
+
+Runs the data phase, full-year generation and each page class's render against
+synthetic Google Calendar and Todoist data, so no credentials or network are needed.
+Results are written as JSON so runs can be compared across commits.
+"""
+import bisect
+import calendar
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import api_client
+import cal_generator
+import config
+import data_processor
+import pages
+
+PAGE_CLASSES = [
+    pages.YearlyOverviewPage, pages.MonthlyOverviewPage, pages.WeeklyPage,
+    pages.DailySchedulePage, pages.DailyTasksPage, pages.NotesPage
+]
+
+HOLIDAYS = [
+    (1, 1, "New Year's Day"), (1, 19, 'Martin Luther King Jr. Day'), (2, 16, "Presidents' Day"),
+    (5, 25, 'Memorial Day'), (6, 19, 'Juneteenth'), (7, 4, 'Independence Day'),
+    (9, 7, 'Labor Day'), (10, 12, 'Columbus Day'), (11, 11, 'Veterans Day'),
+    (11, 26, 'Thanksgiving Day'), (12, 25, 'Christmas Day')
+]
+
+
+def make_events(year, count, seed=0):
+    """
+    Generate `count` synthetic calendar events spread over the year, sorted by start.
+    Roughly 15% are all-day (some spanning several days) and 2% are tagged @headline.
+    """
+    rnd = random.Random(seed)
+    events = []
+    for i in range(count):
+        day = date(year, 1, 1) + timedelta(days=rnd.randrange(366 if calendar.isleap(year) else 365))
+        description = '@headline' if rnd.random() < 0.02 else 'Synthetic benchmark event'
+        if rnd.random() < 0.15:
+            end_day = day + timedelta(days=rnd.choice([1, 1, 1, 2, 3]))
+            start = {'date': day.isoformat()}
+            end = {'date': end_day.isoformat()}
+        else:
+            start_time = datetime(day.year, day.month, day.day, rnd.randrange(6, 21), rnd.choice([0, 15, 30, 45]))
+            end_time = start_time + timedelta(minutes=rnd.choice([15, 30, 60, 90, 120]))
+            start = {'dateTime': start_time.isoformat() + '-05:00'}
+            end = {'dateTime': end_time.isoformat() + '-05:00'}
+        events.append({
+            'id': f'bench{i}',
+            'status': 'confirmed',
+            'summary': f'Event {i}',
+            'description': description,
+            'start': start,
+            'end': end
+        })
+    events.sort(key=api_client.event_start_utc)
+    return events
+
+
+def make_tasks(year, count, seed=0):
+    """Generate `count` synthetic Todoist tasks; every tenth one duplicates an event title."""
+    rnd = random.Random(seed + 1)
+    label_sets = [[], ['15min'], ['1hr', 'work'], ['errand'], ['headline']]
+    tasks = []
+    for i in range(count):
+        day = date(year, 1, 1) + timedelta(days=rnd.randrange(365))
+        tasks.append({
+            'id': str(i),
+            'content': f'Event {i}' if i % 10 == 0 else f'Task {i}',
+            'priority': rnd.randrange(1, 5),
+            'labels': rnd.choice(label_sets),
+            'due': {'date': day.isoformat()}
+        })
+    return tasks
+
+
+class FakeTodoistClient:
+    """Stand-in for TodoistClient that serves synthetic tasks and counts calls."""
+    tasks = []
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    def get_tasks(self, filter_string=None):
+        self.calls += 1
+        if filter_string and filter_string.startswith('due: '):
+            due = filter_string[len('due: '):]
+            return [task for task in self.tasks if task['due']['date'] == due]
+        return list(self.tasks)
+
+    def get_task_by_date(self, date_obj):
+        return self.get_tasks(f"due: {date_obj.strftime('%Y-%m-%d')}")
+
+
+class FakeGoogleCalendarClient:
+    """Stand-in for GoogleCalendarClient that serves synthetic events and counts calls."""
+    events = []
+    holidays = []
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+        self._starts = [api_client.event_start_utc(event).date() for event in self.events]
+
+    def iter_events(self, start_date, end_date, calendar_id='primary'):
+        self.calls += 1
+        if calendar_id == config.GOOGLE_HOLIDAY_CALENDAR:
+            source, starts = self.holidays, [api_client.event_start_utc(event).date() for event in self.holidays]
+        else:
+            source, starts = self.events, self._starts
+        # Events start at most a few days before they end, so look back a week for overlaps.
+        lo = bisect.bisect_left(starts, start_date - timedelta(days=7))
+        hi = bisect.bisect_right(starts, end_date)
+        for event in source[lo:hi]:
+            end = event['end'].get('date') or event['end']['dateTime'][:10]
+            if end >= start_date.isoformat():
+                yield event
+
+    def get_events(self, start_date, end_date, calendar_id='primary'):
+        return list(self.iter_events(start_date, end_date, calendar_id))
+
+    def iter_events_multi(self, calendar_ids, start_date, end_date, required=('primary',)):
+        events = []
+        for calendar_id in calendar_ids:
+            events.extend(dict(event, calendar_id=calendar_id)
+                          for event in self.iter_events(start_date, end_date, calendar_id))
+        events.sort(key=api_client.event_start_utc)
+        return iter(events)
+
+    def get_events_for_day(self, date_obj):
+        return self.get_events(date_obj, date_obj)
+
+
+@contextlib.contextmanager
+def fake_backends(year, event_count, task_count, seed=0):
+    """Swap the API clients used by data_processor for synthetic ones."""
+    FakeGoogleCalendarClient.events = make_events(year, event_count, seed)
+    FakeGoogleCalendarClient.holidays = [
+        {'id': f'holiday{month}{day}', 'summary': name,
+         'start': {'date': date(year, month, day).isoformat()},
+         'end': {'date': (date(year, month, day) + timedelta(days=1)).isoformat()}}
+        for month, day, name in HOLIDAYS
+    ]
+    FakeTodoistClient.tasks = make_tasks(year, task_count, seed)
+
+    patched = [
+        (data_processor, 'TodoistClient', FakeTodoistClient),
+        (data_processor, 'TodoistSyncClient', FakeTodoistClient),
+        (data_processor, 'GoogleCalendarClient', FakeGoogleCalendarClient),
+        (config, 'GOOGLE_EVENT_STORE', None),
+        (config, 'TODOIST_SYNC_CACHE', None),
+        (config, 'GOOGLE_EXTRA_CALENDARS', [])
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in patched]
+    for module, name, value in patched:
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+
+
+@contextlib.contextmanager
+def timed_renders(stats):
+    """Accumulate render() call counts and seconds per page class into stats."""
+    originals = {cls: cls.__dict__['render'] for cls in PAGE_CLASSES}
+
+    def wrap(cls, render):
+        def timed_render(self, c):
+            start = time.perf_counter()
+            try:
+                return render(self, c)
+            finally:
+                entry = stats.setdefault(cls.__name__, {'count': 0, 'seconds': 0.0})
+                entry['count'] += 1
+                entry['seconds'] += time.perf_counter() - start
+        return timed_render
+
+    for cls, render in originals.items():
+        cls.render = wrap(cls, render)
+    try:
+        yield
+    finally:
+        for cls, render in originals.items():
+            cls.render = render
+
+
+def run_case(year, event_count, task_count, jobs=1, seed=0):
+    """Benchmark one density; returns a dict of timings in seconds."""
+    with fake_backends(year, event_count, task_count, seed):
+        start = time.perf_counter()
+        processor = data_processor.PlannerDataProcessor()
+        processor.prefetch(year)
+        processor.get_yearly_overview_items(year)
+        for month in range(1, 13):
+            for day in range(1, 29):
+                processor.get_daily_tasks(date(year, month, day))
+        data_seconds = time.perf_counter() - start
+
+        render_stats = {}
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            try:
+                with timed_renders(render_stats), contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    failed = cal_generator.generate_full_year_planner(year, jobs=jobs, force=True)
+                    full_year_seconds = time.perf_counter() - start
+                output_dir = os.path.join(workdir, f"planner_{year}")
+                output_bytes = sum(os.path.getsize(os.path.join(output_dir, name))
+                                   for name in os.listdir(output_dir) if name.endswith('.pdf'))
+            finally:
+                os.chdir(cwd)
+
+    for entry in render_stats.values():
+        entry['mean_ms'] = round(entry['seconds'] / entry['count'] * 1000, 3)
+        entry['seconds'] = round(entry['seconds'], 4)
+
+    return {
+        'events_per_year': event_count,
+        'tasks': task_count,
+        'data_seconds': round(data_seconds, 4),
+        'full_year_seconds': round(full_year_seconds, 4),
+        'failed_months': failed,
+        'output_bytes': output_bytes,
+        # Worker processes keep their own timings, so per-page numbers are only collected with jobs=1.
+        'render': render_stats if jobs == 1 else None
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark planner generation against synthetic data')
+    parser.add_argument('--year', type=int, default=2026, help='Planner year (default: 2026)')
+    parser.add_argument('--events', default='0,1000,10000,50000',
+                       help='Comma-separated events-per-year densities to run (default: 0,1000,10000,50000)')
+    parser.add_argument('--tasks', type=int, default=500, help='Number of Todoist tasks (default: 500)')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes for full-year generation')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+    parser.add_argument('--output', help='Write results JSON to this file instead of stdout')
+
+    args = parser.parse_args()
+
+    results = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'year': args.year,
+        'jobs': args.jobs,
+        'seed': args.seed,
+        'cases': []
+    }
+    for event_count in [int(n) for n in args.events.split(',') if n.strip()]:
+        case = run_case(args.year, event_count, args.tasks, jobs=args.jobs, seed=args.seed)
+        print(f"{event_count:>6} events: data {case['data_seconds']:.2f}s, "
+              f"full year {case['full_year_seconds']:.2f}s", file=sys.stderr)
+        results['cases'].append(case)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,30 +3,117 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 import calendar
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import date, timedelta
+import hashlib
+import json
 import os
+import sys
 
 from pages import (
-    YearlyOverviewPage, MonthlyOverviewPage, WeeklyPage,
+    LAYOUT_VERSION, index_yearly_items, YearlyOverviewPage, MonthlyOverviewPage, WeeklyPage,
     DailySchedulePage, DailyTasksPage, NotesPage
 )
 from data_processor import PlannerDataProcessor
+import config
+import metrics
+import profiling
 
-def generate_monthly_planner(year, month, output_dir, data_processor):
-    """Generate a single monthly planner PDF."""
-    month_name = calendar.month_name[month]
-    filename = f"{year}_{month:02d}_{month_name}.pdf"
+MANIFEST_FILE = '.manifest.json'
+
+def load_manifest(output_dir):
+    """Load the {filename: fingerprint} manifest for an output directory."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(output_dir, manifest):
+    """Write the manifest, replacing the old file atomically."""
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+def month_fingerprint(year, month, inputs):
+    """Hash everything a month's PDF is rendered from, so unchanged months can be skipped."""
+    payload = json.dumps({
+        'layout_version': LAYOUT_VERSION,
+        'year': year,
+        'month': month,
+        'inputs': inputs
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _month_filename(year, month):
+    return f"{year}_{month:02d}_{calendar.month_name[month]}.pdf"
+
+def generate_monthly_planner(year, month, output_dir, data_processor, manifest=None, yearly_items=None):
+    """
+    Generate a single monthly planner PDF and return its input fingerprint.
+    
+    manifest: Optional {filename: fingerprint} from the previous run. If the month's
+             fingerprint matches and the PDF still exists, rendering is skipped.
+    yearly_items: Optional overview items already computed for the year, shared across months.
+    """
+    filename = _month_filename(year, month)
     filepath = os.path.join(output_dir, filename)
+    month_label = f"{year}-{month:02d}"
+    
+    with metrics.span('prepare', month=month_label):
+        pages, fingerprint = _build_month_pages(year, month, data_processor, yearly_items)
+    
+    if manifest and manifest.get(filename) == fingerprint and os.path.exists(filepath):
+        print(f"Unchanged: {filepath}")
+        metrics.count('months_unchanged')
+        return fingerprint
     
     c = canvas.Canvas(filepath, pagesize=letter, embedFonts=True)
     
+    for i, page in enumerate(pages):
+        page.page_number = i + 1
+    
+    bookmark_to_page = {page.bookmark_name: page.page_number for page in pages}
+    
+    with metrics.span('render', month=month_label):
+        for page in pages:
+            page.render(c)
+            
+            for link in page.links:
+                dest_bookmark = link['dest']
+                if dest_bookmark in bookmark_to_page:
+                    dest_page = bookmark_to_page[dest_bookmark]
+                    x1, y1, x2, y2 = link['rect']
+                    c.linkAbsolute('', dest_bookmark, (x1, y1, x2, y2))
+            
+            c.showPage()
+    
+    profiling.checkpoint()
+    with metrics.span('save', month=month_label):
+        c.save()
+    
+    metrics.count('months_rendered')
+    metrics.record('pdf_pages', len(pages), month=month_label)
+    metrics.record('pdf_bytes', os.path.getsize(filepath), month=month_label)
+    print(f"Generated: {filepath}")
+    return fingerprint
+
+def _build_month_pages(year, month, data_processor, yearly_items=None):
+    """Build a month's page objects and the fingerprint of the data they are rendered from."""
     pages = []
+    inputs = {'weeks': {}, 'days': {}}
     
-    yearly_items = data_processor.get_yearly_overview_items(year)
+    if yearly_items is None:
+        yearly_items = data_processor.get_yearly_overview_items(year)
+    inputs['yearly_items'] = yearly_items
+    inputs['overview_item_display'] = config.OVERVIEW_ITEM_DISPLAY
+    items_by_date = index_yearly_items(yearly_items)
     
     for i in range(4):
         start_month = i * 3 + 1
-        pages.append(YearlyOverviewPage(year, i+1, start_month, current_month=month, yearly_items=yearly_items))
+        pages.append(YearlyOverviewPage(year, i+1, start_month, current_month=month, yearly_items=yearly_items,
+                                        items_by_date=items_by_date, item_display=config.OVERVIEW_ITEM_DISPLAY))
     
     pages.append(MonthlyOverviewPage(year, month))
     
@@ -44,6 +131,7 @@ def generate_monthly_planner(year, month, output_dir, data_processor):
     
     for week_start in week_starts:
         weekly_events = data_processor.get_weekly_events(week_start)
+        inputs['weeks'][week_start.isoformat()] = weekly_events
         pages.append(WeeklyPage(week_start, events=weekly_events))
     
     for day in range(1, calendar.monthrange(year, month)[1] + 1):
@@ -52,6 +140,7 @@ def generate_monthly_planner(year, month, output_dir, data_processor):
         daily_events = data_processor.get_daily_events(day_date)
         daily_tasks = data_processor.get_daily_tasks(day_date)
         headline_events = data_processor.get_headline_events_for_day(day_date)
+        inputs['days'][day_date.isoformat()] = [daily_events, daily_tasks, headline_events]
         
         pages.append(DailySchedulePage(day_date, events=daily_events))
         pages.append(DailyTasksPage(day_date, tasks=daily_tasks, headline_events=headline_events))
@@ -59,35 +148,101 @@ def generate_monthly_planner(year, month, output_dir, data_processor):
     for i in range(10):
         pages.append(NotesPage(i+1))
     
-    for i, page in enumerate(pages):
-        page.page_number = i + 1
-    
-    bookmark_to_page = {page.bookmark_name: page.page_number for page in pages}
-    
-    for page in pages:
-        page.render(c)
-        
-        for link in page.links:
-            dest_bookmark = link['dest']
-            if dest_bookmark in bookmark_to_page:
-                dest_page = bookmark_to_page[dest_bookmark]
-                x1, y1, x2, y2 = link['rect']
-                c.linkAbsolute('', dest_bookmark, (x1, y1, x2, y2))
-        
-        c.showPage()
-    
-    c.save()
-    print(f"Generated: {filepath}")
+    return pages, month_fingerprint(year, month, inputs)
+
+_worker_data = None
+
+def _init_worker(snapshot, profile_settings=None):
+    """Store the year's data snapshot once per worker process."""
+    global _worker_data
+    _worker_data = snapshot
+    profiling.configure(profile_settings)
+
+def _generate_month_in_worker(year, month, output_dir, manifest):
+    """Generate a month and return its fingerprint with the metrics recorded while doing so."""
+    metrics.reset()
+    with profiling.profile(f"month_{year}_{month:02d}"):
+        fingerprint = generate_monthly_planner(year, month, output_dir, _worker_data, manifest)
+    return fingerprint, metrics.snapshot()
 
-def generate_full_year_planner(year):
-    """Generate planner PDFs for all 12 months of the year."""
+def generate_full_year_planner(year, jobs=1, force=False):
+    """
+    Generate planner PDFs for all 12 months of the year.
+    
+    jobs: Number of worker processes rendering months in parallel (1 renders in this process).
+    force: If True, ignore the manifest and re-render every month.
+    Returns the list of months that failed; other months are still written.
+    """
     output_dir = f"planner_{year}"
     os.makedirs(output_dir, exist_ok=True)
     
-    data_processor = PlannerDataProcessor()
+    previous_manifest = {} if force else load_manifest(output_dir)
+    manifest = dict(previous_manifest)
     
-    for month in range(1, 13):
-        generate_monthly_planner(year, month, output_dir, data_processor)
+    data_processor = PlannerDataProcessor()
+    with profiling.profile('fetch'):
+        data_processor.prefetch(year)
+    
+    failed_months = []
+    
+    if jobs > 1:
+        snapshot = data_processor.snapshot(year)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(snapshot, profiling.settings())) as pool:
+            futures = {
+                pool.submit(_generate_month_in_worker, year, month, output_dir, previous_manifest): month
+                for month in range(1, 13)
+            }
+            for future in as_completed(futures):
+                month = futures[future]
+                try:
+                    fingerprint, month_metrics = future.result()
+                    manifest[_month_filename(year, month)] = fingerprint
+                    metrics.merge(month_metrics)
+                except Exception as e:
+                    print(f"✗ Failed to generate {calendar.month_name[month]} {year}: {e}")
+                    failed_months.append(month)
+    else:
+        yearly_items = data_processor.get_yearly_overview_items(year)
+        for month in range(1, 13):
+            try:
+                with profiling.profile(f"month_{year}_{month:02d}"):
+                    manifest[_month_filename(year, month)] = generate_monthly_planner(
+                        year, month, output_dir, data_processor, previous_manifest, yearly_items)
+            except Exception as e:
+                print(f"✗ Failed to generate {calendar.month_name[month]} {year}: {e}")
+                failed_months.append(month)
+    
+    metrics.record('months_failed', len(failed_months))
+    for month in failed_months:
+        manifest.pop(_month_filename(year, month), None)
+    save_manifest(output_dir, manifest)
+    
+    if failed_months:
+        names = ', '.join(calendar.month_name[month] for month in sorted(failed_months))
+        print(f"⚠ {len(failed_months)} month(s) failed: {names}")
+    
+    return sorted(failed_months)
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate reMarkable planner PDFs')
+    parser.add_argument('year', nargs='?', type=int, default=2026, help='Planner year (default: 2026)')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Number of months to render in parallel worker processes')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-render every month even if its inputs are unchanged')
+    profiling.add_arguments(parser)
+    
+    args = parser.parse_args()
+    profiling.enable_from_args(args)
+    with metrics.span('generate'):
+        failed_months = generate_full_year_planner(args.year, jobs=args.jobs, force=args.force)
+    metrics.write_outputs()
+    profiling.write_summary()
+    if failed_months:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    generate_full_year_planner(2026)
\ No newline at end of file
+    main()
@@ -4,5 +4,19 @@ from dotenv import load_dotenv
 load_dotenv()
 
 TODOIST_API_TOKEN = os.getenv('TODOIST_API_TOKEN')
+TODOIST_SYNC_CACHE = os.getenv('TODOIST_SYNC_CACHE')
+TODOIST_POOL_SIZE = int(os.getenv('TODOIST_POOL_SIZE', '4'))
+TODOIST_MAX_RETRIES = int(os.getenv('TODOIST_MAX_RETRIES', '5'))
+TODOIST_MATCH_TASK_IDS = os.getenv('TODOIST_MATCH_TASK_IDS', 'false').lower() in ('1', 'true', 'yes')
+TODOIST_RATE_LIMIT = float(os.getenv('TODOIST_RATE_LIMIT', '0.5'))
+GOOGLE_RATE_LIMIT = float(os.getenv('GOOGLE_RATE_LIMIT', '10'))
 GOOGLE_CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
 GOOGLE_TOKEN_FILE = 'token.json'
+GOOGLE_EVENT_STORE = os.getenv('GOOGLE_EVENT_STORE')
+GOOGLE_HOLIDAY_CALENDAR = 'en.usa#holiday@group.v.calendar.google.com'
+GOOGLE_EXTRA_CALENDARS = [c.strip() for c in os.getenv('GOOGLE_EXTRA_CALENDARS', '').split(',') if c.strip()]
+OVERVIEW_ITEM_DISPLAY = os.getenv('OVERVIEW_ITEM_DISPLAY', 'first').strip().lower()
+if OVERVIEW_ITEM_DISPLAY not in ('first', 'count', 'all'):
+    raise ValueError(f"OVERVIEW_ITEM_DISPLAY must be first, count or all, not {OVERVIEW_ITEM_DISPLAY!r}")
+RUN_REPORT_FILE = os.getenv('RUN_REPORT_FILE')
+METRICS_TEXTFILE = os.getenv('METRICS_TEXTFILE')
@@ -1,170 +1,313 @@
-from datetime import datetime, timedelta
-from dateutil import parser
-from api_client import TodoistClient, GoogleCalendarClient
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+from datetime import date, datetime, timedelta
+from api_client import TodoistClient, TodoistSyncClient, GoogleCalendarClient, RateLimiter, event_start_utc
+from event_store import EventStore
+import metrics
+import profiling
+from models import Event, Task, OverviewItem, format_task_labels, normalize_text, parse_event_time
 import config
-import re
 
 class PlannerDataProcessor:
     def __init__(self):
-        self.todoist = TodoistClient(config.TODOIST_API_TOKEN)
-        self.gcal = GoogleCalendarClient()
+        todoist_options = {
+            'pool_size': config.TODOIST_POOL_SIZE,
+            'max_retries': config.TODOIST_MAX_RETRIES,
+            'rate_limiter': RateLimiter(config.TODOIST_RATE_LIMIT, burst=50)
+        }
+        if config.TODOIST_SYNC_CACHE:
+            self.todoist = TodoistSyncClient(config.TODOIST_API_TOKEN, config.TODOIST_SYNC_CACHE, **todoist_options)
+        else:
+            self.todoist = TodoistClient(config.TODOIST_API_TOKEN, **todoist_options)
+        self.gcal = GoogleCalendarClient(rate_limiter=RateLimiter(config.GOOGLE_RATE_LIMIT, burst=10))
+        self._events_by_date = None
+        self._calendar_keys_by_date = {}
+        self._prefetch_range = None
+        self._holidays = None
+        self._tasks_by_date = None
+        self._headline_tasks = None
+        self._yearly_items = {}
     
-    def format_task_labels(self, labels):
-        """Format labels with time tags first."""
-        time_tags = []
-        other_tags = []
+    def prefetch(self, year):
+        """
+        Fetch a whole year of events (plus boundary weeks) and all tasks, and index them by date.
+        The calendar and Todoist fetches run at the same time, one thread each.
+        """
+        range_start = date(year, 1, 1)
+        range_start -= timedelta(days=range_start.weekday())
+        range_end = date(year, 12, 31)
+        range_end += timedelta(days=6 - range_end.weekday())
+        
+        with metrics.span('fetch'), ThreadPoolExecutor(max_workers=2) as pool:
+            events_job = pool.submit(profiling.thread_target(self._fetch_range_list), range_start, range_end)
+            tasks_job = pool.submit(profiling.thread_target(self._load_tasks))
+            events = events_job.result()
+            tasks_job.result()
+        
+        events_by_date = defaultdict(list)
+        holidays = []
+        seen_ids = set()
+        
+        for raw_event in events:
+            if raw_event.get('calendar_id') == config.GOOGLE_HOLIDAY_CALENDAR:
+                holidays.append(raw_event)
+                continue
+            
+            event_id = raw_event.get('id')
+            if event_id is not None:
+                if event_id in seen_ids:
+                    continue
+                seen_ids.add(event_id)
+            event = Event.from_api(raw_event)
+            for event_date in event.dates():
+                events_by_date[event_date].append(event)
+        
+        self._events_by_date = events_by_date
+        self._calendar_keys_by_date = {}
+        self._holidays = holidays
+        self._prefetch_range = (range_start, range_end)
+    
+    def snapshot(self, year):
+        """Precompute every accessor result the year's planner needs into a PlannerSnapshot."""
+        if self._prefetch_range is None:
+            self.prefetch(year)
+        range_start, range_end = self._prefetch_range
+        
+        daily_events = {}
+        daily_tasks = {}
+        headline_events = {}
+        weekly_events = {}
+        
+        current_date = range_start
+        while current_date <= range_end:
+            daily_events[current_date] = self.get_daily_events(current_date)
+            daily_tasks[current_date] = self.get_daily_tasks(current_date)
+            headline_events[current_date] = self.get_headline_events_for_day(current_date)
+            if current_date.weekday() == 0:
+                weekly_events[current_date] = self.get_weekly_events(current_date)
+            current_date += timedelta(days=1)
+        
+        return PlannerSnapshot(year, daily_events, daily_tasks, headline_events, weekly_events,
+                               self.get_yearly_overview_items(year))
+    
+    def _fetch_range_list(self, range_start, range_end):
+        """Collect _fetch_range into a list, timing it as the calendar fetch stage."""
+        with metrics.span('fetch_calendar'):
+            events = list(self._fetch_range(range_start, range_end))
+        metrics.record('events_fetched', len(events))
+        return events
+    
+    def _fetch_range(self, range_start, range_end):
+        """Yield raw events for a date range from every followed calendar, merged by start time."""
+        calendar_ids = config.GOOGLE_EXTRA_CALENDARS + [config.GOOGLE_HOLIDAY_CALENDAR]
+        
+        if config.GOOGLE_EVENT_STORE:
+            with EventStore(config.GOOGLE_EVENT_STORE) as event_store:
+                self.gcal.sync_events(event_store, start_date=range_start, end_date=range_end)
+                stored_events = event_store.get_events(range_start, range_end)
+            yield from heapq.merge(
+                stored_events,
+                self.gcal.iter_events_multi(calendar_ids, range_start, range_end),
+                key=event_start_utc
+            )
+        else:
+            yield from self.gcal.iter_events_multi(['primary'] + calendar_ids, range_start, range_end)
+    
+    def _fetch_events(self, start_date, end_date):
+        """Fetch events from the primary and any extra calendars."""
+        if config.GOOGLE_EXTRA_CALENDARS:
+            calendar_ids = ['primary'] + config.GOOGLE_EXTRA_CALENDARS
+            raw_events = self.gcal.iter_events_multi(calendar_ids, start_date, end_date)
+        else:
+            raw_events = self.gcal.get_events(start_date, end_date)
+        return [Event.from_api(event) for event in raw_events]
+    
+    def _load_tasks(self):
+        """Fetch all open tasks once and index them by due date."""
+        tasks_by_date = defaultdict(list)
+        headline_tasks = []
+        
+        with metrics.span('fetch_tasks'):
+            raw_tasks = self.todoist.get_tasks()
+        metrics.record('tasks_fetched', len(raw_tasks))
         
-        for label in labels:
-            if 'min' in label or 'hr' in label:
-                time_tags.append(f"@{label}")
-            else:
-                other_tags.append(f"@{label}")
+        for raw_task in raw_tasks:
+            task = Task.from_api(raw_task)
+            if task is None:
+                continue
+            
+            tasks_by_date[task.due_date].append(task)
+            if task.is_headline:
+                headline_tasks.append(OverviewItem(task.due_date, task.content, 'task'))
+        
+        self._tasks_by_date = tasks_by_date
+        self._headline_tasks = headline_tasks
+    
+    def _tasks_for_day(self, date_obj):
+        """Get indexed tasks due on a day, loading the task snapshot on first use."""
+        if self._tasks_by_date is None:
+            self._load_tasks()
+        return self._tasks_by_date.get(date_obj, [])
+    
+    def _is_prefetched(self, start_date, end_date):
+        if self._prefetch_range is None:
+            return False
+        return self._prefetch_range[0] <= start_date and end_date <= self._prefetch_range[1]
+    
+    def _events_for_day(self, date_obj):
+        """Get calendar events for a day, from the prefetched index when available."""
+        if self._is_prefetched(date_obj, date_obj):
+            return self._events_by_date.get(date_obj, [])
+        return self._fetch_events(date_obj, date_obj)
+    
+    def _events_between(self, start_date, end_date):
+        """Get calendar events between two dates, from the prefetched index when available."""
+        if not self._is_prefetched(start_date, end_date):
+            return self._fetch_events(start_date, end_date)
         
-        return ' '.join(time_tags + other_tags)
+        events = []
+        seen = set()
+        current_date = start_date
+        while current_date <= end_date:
+            for event in self._events_by_date.get(current_date, []):
+                if id(event) not in seen:
+                    seen.add(id(event))
+                    events.append(event)
+            current_date += timedelta(days=1)
+        return events
+    
+    def format_task_labels(self, labels):
+        """Format labels with time tags first."""
+        return format_task_labels(labels)
     
     def normalize_text(self, text):
         """Normalize text for comparison."""
-        return re.sub(r'[^\w\s]', '', text.lower()).strip()
+        return normalize_text(text)
+    
+    def _calendar_keys(self, calendar_events):
+        """Return the sets of normalized labels and linked Todoist task ids for some events."""
+        labels = {event.normalized_label for event in calendar_events}
+        task_ids = set()
+        if config.TODOIST_MATCH_TASK_IDS:
+            task_ids = {event.task_id for event in calendar_events if event.task_id}
+        return labels, task_ids
+    
+    def _calendar_keys_for_day(self, date_obj):
+        """Get a day's calendar keys, cached per day when the events are prefetched."""
+        if not self._is_prefetched(date_obj, date_obj):
+            return self._calendar_keys(self._fetch_events(date_obj, date_obj))
+        if date_obj not in self._calendar_keys_by_date:
+            self._calendar_keys_by_date[date_obj] = self._calendar_keys(self._events_by_date.get(date_obj, []))
+        return self._calendar_keys_by_date[date_obj]
+    
+    def _is_duplicate(self, task, calendar_keys):
+        labels, task_ids = calendar_keys
+        return task.normalized_content in labels or any(link_id in task_ids for link_id in task.link_ids)
     
     def is_task_on_calendar(self, task, calendar_events):
         """Check if a Todoist task is already on the calendar."""
-        task_content = self.normalize_text(task['content'])
-        
-        for event in calendar_events:
-            event_summary = self.normalize_text(event.get('summary', ''))
-            if task_content == event_summary:
-                return True
-        
-        return False
+        return self._is_duplicate(task, self._calendar_keys(calendar_events))
     
     def parse_event_time(self, event_time):
         """Parse event start/end time."""
-        if 'dateTime' in event_time:
-            return parser.parse(event_time['dateTime'])
-        else:
-            return parser.parse(event_time['date'])
+        return parse_event_time(event_time)
     
     def get_daily_tasks(self, date_obj):
         """Get tasks for a specific day, excluding calendar duplicates."""
-        tasks = self.todoist.get_task_by_date(date_obj)
-        calendar_events = self.gcal.get_events_for_day(date_obj)
-        
-        formatted_tasks = []
-        for task in tasks:
-            if not self.is_task_on_calendar(task, calendar_events):
-                labels_str = self.format_task_labels(task.get('labels', []))
-                task_text = task['content']
-                if labels_str:
-                    task_text = f"{task_text} {labels_str}"
-                
-                formatted_tasks.append({
-                    'text': task_text,
-                    'priority': task.get('priority', 1)
-                })
-        
-        return formatted_tasks
+        tasks = self._tasks_for_day(date_obj)
+        if not tasks:
+            return []
+        calendar_keys = self._calendar_keys_for_day(date_obj)
+        
+        return [task for task in tasks if not self._is_duplicate(task, calendar_keys)]
     
     def get_daily_events(self, date_obj):
-        """Get calendar events for a specific day with start/end times and labels."""
-        events = self.gcal.get_events_for_day(date_obj)
-        
-        formatted_events = []
-        for event in events:
-            start_time = self.parse_event_time(event['start'])
-            end_time = self.parse_event_time(event['end'])
-            
-            is_all_day = 'date' in event['start']
-            
-            formatted_events.append({
-                'label': event.get('summary', 'Untitled'),
-                'start': start_time,
-                'end': end_time,
-                'is_all_day': is_all_day
-            })
-        
-        return formatted_events
+        """Get calendar events for a specific day."""
+        return list(self._events_for_day(date_obj))
     
     def get_weekly_events(self, week_start_date):
         """Get calendar events for a week."""
         week_end = week_start_date + timedelta(days=6)
-        events = self.gcal.get_events(week_start_date, week_end)
-        
-        formatted_events = []
-        for event in events:
-            start_time = self.parse_event_time(event['start'])
-            end_time = self.parse_event_time(event['end'])
-            
-            formatted_events.append({
-                'label': event.get('summary', 'Untitled'),
-                'start': start_time,
-                'end': end_time,
-                'is_all_day': 'date' in event['start']
-            })
-        
-        return formatted_events
+        return self._events_between(week_start_date, week_end)
     
     def get_yearly_overview_items(self, year):
         """Get tasks and events tagged with @headline for the yearly overview, plus holidays."""
+        if year not in self._yearly_items:
+            self._yearly_items[year] = self._build_yearly_overview_items(year)
+        return self._yearly_items[year]
+    
+    def _build_yearly_overview_items(self, year):
         start_date = datetime(year, 1, 1).date()
         end_date = datetime(year, 12, 31).date()
         
-        events = self.gcal.get_events(start_date, end_date)
-        try:
-            holidays = self.gcal.get_events(start_date, end_date, calendar_id='en.usa#holiday@group.v.calendar.google.com')
-        except:
-            holidays = []
+        events = self._events_between(start_date, end_date)
+        if self._is_prefetched(start_date, end_date):
+            holidays = self._holidays
+        else:
+            try:
+                holidays = self.gcal.get_events(start_date, end_date, calendar_id=config.GOOGLE_HOLIDAY_CALENDAR)
+            except:
+                holidays = []
         
-        all_tasks = self.todoist.get_tasks()
+        if self._headline_tasks is None:
+            self._load_tasks()
         
         items = []
         
         for event in events:
-            description = event.get('description', '')
-            if '@headline' in description.lower():
-                event_date = self.parse_event_time(event['start']).date()
+            if event.is_headline:
+                event_date = event.start.date()
                 if start_date <= event_date <= end_date:
-                    items.append({
-                        'date': event_date,
-                        'text': event.get('summary', 'Untitled'),
-                        'type': 'event'
-                    })
+                    items.append(OverviewItem(event_date, event.label, 'event'))
         
         for holiday in holidays:
-            holiday_date = self.parse_event_time(holiday['start']).date()
-            items.append({
-                'date': holiday_date,
-                'text': holiday.get('summary', 'Holiday'),
-                'type': 'holiday'
-            })
-        
-        for task in all_tasks:
-            if 'headline' in [label.lower() for label in task.get('labels', [])]:
-                if task.get('due') and task['due'].get('date'):
-                    task_date = parser.parse(task['due']['date']).date()
-                    if start_date <= task_date <= end_date:
-                        items.append({
-                            'date': task_date,
-                            'text': task['content'],
-                            'type': 'task'
-                        })
-        
-        items.sort(key=lambda x: x['date'])
+            holiday_date = parse_event_time(holiday['start']).date()
+            if not start_date <= holiday_date <= end_date:
+                continue
+            items.append(OverviewItem(holiday_date, holiday.get('summary', 'Holiday'), 'holiday'))
+        
+        for task in self._headline_tasks:
+            if start_date <= task.date <= end_date:
+                items.append(task)
+        
+        items.sort(key=lambda x: x.date)
         return items
     
     def get_headline_events_for_day(self, date_obj):
         """Get headline events for a specific day."""
-        events = self.gcal.get_events_for_day(date_obj)
-        
-        headline_events = []
-        for event in events:
-            description = event.get('description', '')
-            if '@headline' in description.lower():
-                headline_events.append({
-                    'text': event.get('summary', 'Untitled'),
-                    'type': 'event'
-                })
-        
-        return headline_events
+        return [event for event in self._events_for_day(date_obj) if event.is_headline]
+
+
+class PlannerSnapshot:
+    """
+    Picklable, precomputed planner data for one year. Offers the same accessors
+    as PlannerDataProcessor so it can be handed to worker processes in its place.
+    """
+    def __init__(self, year, daily_events, daily_tasks, headline_events, weekly_events, yearly_items):
+        self.year = year
+        self.daily_events = daily_events
+        self.daily_tasks = daily_tasks
+        self.headline_events = headline_events
+        self.weekly_events = weekly_events
+        self.yearly_items = yearly_items
+    
+    def get_daily_events(self, date_obj):
+        return self.daily_events.get(date_obj, [])
+    
+    def get_daily_tasks(self, date_obj):
+        return self.daily_tasks.get(date_obj, [])
+    
+    def get_headline_events_for_day(self, date_obj):
+        return self.headline_events.get(date_obj, [])
+    
+    def get_weekly_events(self, week_start_date):
+        return self.weekly_events.get(week_start_date, [])
+    
+    def get_yearly_overview_items(self, year):
+        if year != self.year:
+            raise ValueError(f"Snapshot holds {self.year} data, not {year}")
+        return self.yearly_items
 
 
 def test_processor():
@@ -177,19 +320,19 @@ def test_processor():
     print("="*60)
     tasks = processor.get_daily_tasks(today)
     for task in tasks:
-        print(f"  - {task['text']}")
+        print(f"  - {task.text}")
     
     print("\n" + "="*60)
     print("DAILY EVENTS:")
     print("="*60)
     events = processor.get_daily_events(today)
     for event in events:
-        if event['is_all_day']:
-            print(f"  - {event['label']} (All day)")
+        if event.is_all_day:
+            print(f"  - {event.label} (All day)")
         else:
-            start_str = event['start'].strftime('%H:%M')
-            end_str = event['end'].strftime('%H:%M')
-            print(f"  - {event['label']} ({start_str} - {end_str})")
+            start_str = event.start.strftime('%H:%M')
+            end_str = event.end.strftime('%H:%M')
+            print(f"  - {event.label} ({start_str} - {end_str})")
     
     print("\n" + "="*60)
     print("WEEKLY EVENTS:")
@@ -197,12 +340,12 @@ def test_processor():
     week_start = today - timedelta(days=today.weekday())
     weekly_events = processor.get_weekly_events(week_start)
     for event in weekly_events[:5]:
-        day = event['start'].strftime('%a')
-        if event['is_all_day']:
-            print(f"  - {day}: {event['label']} (All day)")
+        day = event.start.strftime('%a')
+        if event.is_all_day:
+            print(f"  - {day}: {event.label} (All day)")
         else:
-            time_str = event['start'].strftime('%H:%M')
-            print(f"  - {day} {time_str}: {event['label']}")
+            time_str = event.start.strftime('%H:%M')
+            print(f"  - {day} {time_str}: {event.label}")
 
 
 if __name__ == "__main__":
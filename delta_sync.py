@@ -0,0 +1,134 @@
+"""
+rsync-style block delta between two versions of a file.
+
+The old file is cut into fixed-size blocks, each indexed by a weak rolling checksum
+(Adler-32) and a strong one (MD5). The new file is scanned with the rolling checksum
+so blocks that merely moved, e.g. behind a page whose text got longer, are still
+found. The result is a list of operations: copy a run of old blocks, or insert
+literal bytes. device_script() turns that into a BusyBox shell script that rebuilds
+the new file next to the old one, checks its SHA-256 and renames it into place.
+"""
+import hashlib
+import zlib
+
+DELTA_BLOCK_SIZE = 2048
+ADLER_MOD = 65521
+
+
+def block_signature(data, block_size=DELTA_BLOCK_SIZE):
+    """Return {adler32: {md5: block_index}} for every full block of data."""
+    signature = {}
+    for index in range(len(data) // block_size):
+        block = data[index * block_size:(index + 1) * block_size]
+        strong = hashlib.md5(block).digest()
+        signature.setdefault(zlib.adler32(block), {}).setdefault(strong, index)
+    return signature
+
+
+def shared_block_fraction(old, new, block_size=DELTA_BLOCK_SIZE, samples=32):
+    """Estimate the share of old's blocks that occur anywhere in new, from a sample of them."""
+    count = len(old) // block_size
+    if count == 0:
+        return 0.0
+    indices = range(0, count, max(1, count // samples))
+    found = sum(1 for index in indices if old[index * block_size:(index + 1) * block_size] in new)
+    return found / len(indices)
+
+
+def compute_delta(old, new, block_size=DELTA_BLOCK_SIZE, max_literal_ratio=0.5):
+    """
+    Return operations that rebuild `new` from `old`: ('copy', first_block, block_count)
+    and ('data', bytes). Returns None once more than max_literal_ratio of `new` would
+    have to be sent as literal bytes, since a plain upload is cheaper by then.
+
+    Matching blocks are skipped a whole block at a time, but literal bytes are scanned one
+    by one in Python, so a file that shares little with `old` is the slow case. A sampled
+    substring check (which runs in C) rules most of those out before the scan starts.
+    """
+    if shared_block_fraction(old, new, block_size) < (1 - max_literal_ratio) / 2:
+        return None
+
+    signature = block_signature(old, block_size)
+    lookup = signature.get
+    md5 = hashlib.md5
+    max_literal = len(new) * max_literal_ratio
+    literal_total = 0
+    ops = []
+
+    literal_start = 0
+    position = 0
+    last = len(new) - block_size
+    weak = None
+    while position <= last:
+        if weak is None:
+            weak = zlib.adler32(new[position:position + block_size])
+            a = weak & 0xffff
+            b = weak >> 16
+
+        candidates = lookup(weak)
+        if candidates:
+            index = candidates.get(md5(new[position:position + block_size]).digest())
+            if index is not None:
+                if literal_start < position:
+                    ops.append(('data', new[literal_start:position]))
+                if ops and ops[-1][0] == 'copy' and ops[-1][1] + ops[-1][2] == index:
+                    ops[-1] = ('copy', ops[-1][1], ops[-1][2] + 1)
+                else:
+                    ops.append(('copy', index, 1))
+                position += block_size
+                literal_start = position
+                weak = None
+                continue
+
+        literal_total += 1
+        if literal_total > max_literal:
+            return None
+        if position < last:
+            # Slide the Adler-32 window one byte: drop new[position], append the byte after the window.
+            out_byte = new[position]
+            a = (a - out_byte + new[position + block_size]) % ADLER_MOD
+            b = (b - block_size * out_byte + a - 1) % ADLER_MOD
+            weak = (b << 16) | a
+        position += 1
+
+    if literal_start < len(new):
+        ops.append(('data', new[literal_start:]))
+    if sum(len(op[1]) for op in ops if op[0] == 'data') > max_literal:
+        return None
+    return ops
+
+
+def pack_literals(ops):
+    """Concatenate the literal data of ops into one payload. Returns (payload, [(op, payload_offset)])."""
+    payload = bytearray()
+    placed = []
+    for op in ops:
+        if op[0] == 'data':
+            placed.append((op, len(payload)))
+            payload += op[1]
+        else:
+            placed.append((op, None))
+    return bytes(payload), placed
+
+
+def device_script(placed, old_path, payload_path, tmp_path, expected_sha256, block_size=DELTA_BLOCK_SIZE):
+    """
+    Build a shell script that assembles the new file at tmp_path from old_path and the
+    literal payload, then renames it over old_path only if its SHA-256 matches.
+    Exits non-zero (leaving old_path untouched) on any mismatch.
+    """
+    lines = ['{']
+    for op, payload_offset in placed:
+        if op[0] == 'copy':
+            lines.append(f"dd if='{old_path}' bs={block_size} skip={op[1]} count={op[2]} 2>/dev/null")
+        else:
+            lines.append(f"tail -c +{payload_offset + 1} '{payload_path}' | head -c {len(op[1])}")
+    lines.append(f"}} > '{tmp_path}'")
+    lines.append(f"rm -f '{payload_path}'")
+    lines.append(f"if [ \"$(sha256sum '{tmp_path}' | cut -d' ' -f1)\" = '{expected_sha256}' ]; then")
+    lines.append(f"  mv '{tmp_path}' '{old_path}'")
+    lines.append("else")
+    lines.append(f"  rm -f '{tmp_path}'")
+    lines.append("  exit 1")
+    lines.append("fi")
+    return '\n'.join(lines) + '\n'
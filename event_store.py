@@ -0,0 +1,139 @@
+import json
+import logging
+import sqlite3
+from datetime import date, timezone
+from models import date_span, parse_event_time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    first_date TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    sort_key TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS events_by_date ON events (calendar_id, first_date, last_date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_window (
+    calendar_id TEXT PRIMARY KEY,
+    start_date TEXT,
+    end_date TEXT
+);
+"""
+
+
+def _event_span(event):
+    """Return (first_date, last_date, sort_key) for an event, treating end times as exclusive."""
+    start_time = parse_event_time(event['start'])
+    if 'dateTime' in event['start']:
+        sort_key = start_time.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    else:
+        sort_key = start_time.strftime('%Y-%m-%dT%H:%M:%S')
+    end_time = parse_event_time(event['end'])
+
+    first_date, last_date = date_span(start_time, end_time, 'date' in event['start'])
+    return first_date.isoformat(), last_date.isoformat(), sort_key
+
+
+class EventStore:
+    """
+    SQLite cache of Google Calendar events plus the sync token for each calendar.
+    The store may be handed to a fetch thread but must not be used from two threads at once.
+    Use it as a context manager (or call close()) to release the database connection.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_window(self, calendar_id='primary'):
+        """Return the (start_date, end_date) the last full sync covered, or None if unbounded or unknown."""
+        row = self.conn.execute(
+            "SELECT start_date, end_date FROM sync_window WHERE calendar_id = ?", (calendar_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return date.fromisoformat(row[0]), date.fromisoformat(row[1])
+
+    def get_sync_token(self, calendar_id='primary'):
+        """Return the stored sync token for a calendar, or None before the first full sync."""
+        row = self.conn.execute(
+            "SELECT sync_token FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def apply_changes(self, calendar_id, events, sync_token, replace=False, window=None):
+        """
+        Apply a page set from events().list to the store.
+
+        replace: If True, drop everything stored for the calendar first (full sync).
+                If False, upsert changed events and delete cancelled ones (incremental sync).
+        window: The (start_date, end_date) a full sync was limited to, recorded with it.
+        """
+        upserted = 0
+        deleted = 0
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+
+            for event in events:
+                if event.get('status') == 'cancelled' or 'start' not in event:
+                    self.conn.execute(
+                        "DELETE FROM events WHERE calendar_id = ? AND event_id = ?",
+                        (calendar_id, event['id'])
+                    )
+                    deleted += 1
+                    continue
+
+                first_date, last_date, sort_key = _event_span(event)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                    (calendar_id, event['id'], first_date, last_date, sort_key, json.dumps(event))
+                )
+                upserted += 1
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (calendar_id, sync_token)
+            )
+            if replace:
+                self.conn.execute("DELETE FROM sync_window WHERE calendar_id = ?", (calendar_id,))
+                if window:
+                    self.conn.execute(
+                        "INSERT INTO sync_window VALUES (?, ?, ?)",
+                        (calendar_id, window[0].isoformat(), window[1].isoformat())
+                    )
+
+        logger.info(f"Event store {calendar_id}: {upserted} upserted, {deleted} deleted")
+
+    def get_events(self, start_date, end_date, calendar_id='primary'):
+        """Return stored events touching start_date..end_date, ordered by start time."""
+        rows = self.conn.execute(
+            "SELECT body FROM events WHERE calendar_id = ? AND first_date <= ? AND last_date >= ? "
+            "ORDER BY sort_key",
+            (calendar_id, end_date.isoformat(), start_date.isoformat())
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self, calendar_id='primary'):
+        """Forget all events and the sync token for a calendar."""
+        with self.conn:
+            self.conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+            self.conn.execute("DELETE FROM sync_state WHERE calendar_id = ?", (calendar_id,))
+            self.conn.execute("DELETE FROM sync_window WHERE calendar_id = ?", (calendar_id,))
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
@@ -1,14 +1,34 @@
 #!/usr/bin/env python3
-import sys
 import os
+import sys
 from cal_generator import generate_full_year_planner
 from sync_to_remarkable import RemarkableSync
+import metrics
+import profiling
 
 def main():
-    year = int(sys.argv[1]) if len(sys.argv) > 1 else 2026
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate planner PDFs and sync them to reMarkable')
+    parser.add_argument('year', nargs='?', type=int, default=2026, help='Planner year (default: 2026)')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Number of months to render in parallel worker processes')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-render every month even if its inputs are unchanged')
+    profiling.add_arguments(parser)
+    
+    args = parser.parse_args()
+    year = args.year
+    profiling.enable_from_args(args)
     
     print(f"Generating planner for {year}...")
-    generate_full_year_planner(year)
+    with metrics.span('generate'):
+        failed_months = generate_full_year_planner(year, jobs=args.jobs, force=args.force)
+    if failed_months:
+        print(f"✗ Generation incomplete, skipping reMarkable sync")
+        metrics.write_outputs()
+        profiling.write_summary()
+        sys.exit(1)
     print(f"✓ Generation complete!")
     
     password = os.getenv('REMARKABLE_PASSWORD')
@@ -17,7 +37,8 @@ def main():
     if password and host:
         print(f"\nSyncing to reMarkable at {host}...")
         sync = RemarkableSync(host=host, password=password)
-        success = sync.upload_directory(f"{year}_Planner", fail_on_error=False)
+        with profiling.profile('sync'):
+            success = sync.upload_directory(f"{year}_Planner", fail_on_error=False)
         
         if success:
             print(f"✓ Sync complete!")
@@ -27,6 +48,9 @@ def main():
     else:
         print("\nSkipping reMarkable sync (credentials not configured)")
         print(f"PDFs saved to planner_{year}/")
+    
+    metrics.write_outputs()
+    profiling.write_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Run instrumentation: stage timings, counters and recorded values for one process.
+
+Stages are timed with span(), API calls and bytes are tallied with count(), and
+per-month figures such as page counts are stored with record(). Every metric
+takes optional labels (service=..., month=...). write_outputs() writes the run
+report as JSON and, optionally, as a Prometheus textfile.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import os
+import threading
+import time
+
+import config
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_values = {}
+_started = time.time()
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+@contextmanager
+def span(stage, **labels):
+    """Time a block of work under a stage name; repeated spans accumulate."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            entry = _stages.setdefault(_key(stage, labels), [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+
+def count(name, amount=1, **labels):
+    """Add to a counter, e.g. count('api_calls', service='google')."""
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def record(name, value, **labels):
+    """Store a value, replacing any earlier one with the same name and labels."""
+    with _lock:
+        _values[_key(name, labels)] = value
+
+
+def reset():
+    """Forget everything recorded so far and restart the run clock."""
+    global _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _values.clear()
+        _started = time.time()
+
+
+def snapshot():
+    """Return a picklable copy of the recorded metrics, for handing back from worker processes."""
+    with _lock:
+        return {
+            'stages': {key: list(entry) for key, entry in _stages.items()},
+            'counters': dict(_counters),
+            'values': dict(_values)
+        }
+
+
+def merge(data):
+    """Add metrics from snapshot() (typically taken in a worker process) into this process."""
+    with _lock:
+        for key, (runs, seconds) in data['stages'].items():
+            entry = _stages.setdefault(key, [0, 0.0])
+            entry[0] += runs
+            entry[1] += seconds
+        for key, amount in data['counters'].items():
+            _counters[key] = _counters.get(key, 0) + amount
+        _values.update(data['values'])
+
+
+def report():
+    """Build the run report as a JSON-serialisable dict."""
+    with _lock:
+        return {
+            'started': datetime.fromtimestamp(_started, timezone.utc).isoformat(),
+            'duration_seconds': round(time.time() - _started, 3),
+            'stages': [dict(labels, stage=name, count=runs, seconds=round(seconds, 4))
+                       for (name, labels), (runs, seconds) in sorted(_stages.items())],
+            'counters': [dict(labels, name=name, value=value)
+                         for (name, labels), value in sorted(_counters.items())],
+            'values': [dict(labels, name=name, value=value)
+                       for (name, labels), value in sorted(_values.items())]
+        }
+
+
+def _prometheus_escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _prometheus_line(metric, labels, value):
+    if labels:
+        label_str = ','.join(f'{k}="{_prometheus_escape(v)}"' for k, v in labels)
+        return f"planner_{metric}{{{label_str}}} {value}"
+    return f"planner_{metric} {value}"
+
+
+def prometheus_text():
+    """Render the metrics in the Prometheus text exposition format, one # TYPE line per metric."""
+    data = report()
+    families = {
+        'run_timestamp_seconds': ('gauge', [((), round(_started, 3))]),
+        'run_duration_seconds': ('gauge', [((), data['duration_seconds'])])
+    }
+    with _lock:
+        for (name, labels), (runs, seconds) in sorted(_stages.items()):
+            stage_labels = (('stage', name),) + labels
+            families.setdefault('stage_seconds_total', ('counter', []))[1].append((stage_labels, round(seconds, 4)))
+            families.setdefault('stage_runs_total', ('counter', []))[1].append((stage_labels, runs))
+        for (name, labels), value in sorted(_counters.items()):
+            families.setdefault(f"{name}_total", ('counter', []))[1].append((labels, value))
+        for (name, labels), value in sorted(_values.items()):
+            families.setdefault(name, ('gauge', []))[1].append((labels, value))
+    
+    lines = []
+    for metric, (metric_type, samples) in families.items():
+        lines.append(f"# TYPE planner_{metric} {metric_type}")
+        lines.extend(_prometheus_line(metric, labels, value) for labels, value in samples)
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path, text):
+    with open(f"{path}.tmp", 'w') as f:
+        f.write(text)
+    os.replace(f"{path}.tmp", path)
+
+
+def write_outputs(report_file=None, textfile=None):
+    """
+    Write the JSON run report and Prometheus textfile, defaulting to the
+    RUN_REPORT_FILE and METRICS_TEXTFILE settings. Either may be unset.
+    """
+    report_file = report_file or config.RUN_REPORT_FILE
+    textfile = textfile or config.METRICS_TEXTFILE
+    try:
+        if report_file:
+            _write_atomic(report_file, json.dumps(report(), indent=2) + '\n')
+        if textfile:
+            _write_atomic(textfile, prometheus_text())
+    except OSError as e:
+        print(f"⚠ Could not write run report: {e}")
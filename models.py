@@ -0,0 +1,172 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from dateutil import parser
+from functools import lru_cache
+import re
+
+# Todoist's calendar sync links each event to its task, e.g.
+# https://app.todoist.com/app/task/call-the-bank-6X7rM8997g8PvqHQ or todoist.com/showTask?id=123
+TODOIST_TASK_LINK = re.compile(r'todoist\.com/(?:app/task/|showTask\?id=)(?:[\w-]*-)?(\w+)')
+
+@lru_cache(maxsize=8192)
+def parse_iso(value):
+    """
+    Parse an ISO-8601 date or datetime string as sent by Google Calendar and Todoist.
+    Uses datetime.fromisoformat (with a trailing 'Z' read as UTC) and only falls back
+    to dateutil for anything it rejects. Results are memoized; datetimes are immutable.
+    """
+    try:
+        if value.endswith('Z'):
+            return datetime.fromisoformat(value[:-1] + '+00:00')
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return parser.parse(value)
+
+
+def parse_event_time(event_time):
+    """Parse a Google Calendar start/end object."""
+    if 'dateTime' in event_time:
+        return parse_iso(event_time['dateTime'])
+    else:
+        return parse_iso(event_time['date'])
+
+
+def date_span(start, end, is_all_day):
+    """
+    Return (first_date, last_date) that an event from start to end touches. The end is
+    exclusive: all-day events end the day after, and a timed event ending at midnight
+    does not touch the day it ends on.
+    """
+    first_date = start.date()
+    last_date = end.date()
+    if is_all_day or (end.hour == 0 and end.minute == 0 and last_date > first_date):
+        last_date -= timedelta(days=1)
+    return first_date, max(first_date, last_date)
+
+
+def normalize_text(text):
+    """Normalize text for comparison."""
+    return re.sub(r'[^\w\s]', '', text.lower()).strip()
+
+
+def todoist_task_id(description):
+    """Return the Todoist task id linked from a synced event's description, or None."""
+    match = TODOIST_TASK_LINK.search(description)
+    return match.group(1) if match else None
+
+
+def task_link_ids(task):
+    """
+    Return the ids a calendar event's Todoist link may carry for a task: its numeric id
+    (old showTask?id= links) and, from the Sync API, its v2_id (app/task/ links).
+    """
+    ids = []
+    if task.get('id') is not None:
+        ids.append(str(task['id']))
+    if task.get('v2_id'):
+        ids.append(task['v2_id'])
+    return tuple(ids)
+
+
+def format_task_labels(labels):
+    """Format labels with time tags first."""
+    time_tags = []
+    other_tags = []
+
+    for label in labels:
+        if 'min' in label or 'hr' in label:
+            time_tags.append(f"@{label}")
+        else:
+            other_tags.append(f"@{label}")
+
+    return ' '.join(time_tags + other_tags)
+
+
+@dataclass
+class Event:
+    """A calendar event, parsed and normalized once when it is fetched."""
+    __slots__ = ('id', 'label', 'start', 'end', 'is_all_day', 'is_headline',
+                 'normalized_label', 'calendar_id', 'task_id')
+    id: str
+    label: str
+    start: datetime
+    end: datetime
+    is_all_day: bool
+    is_headline: bool
+    normalized_label: str
+    calendar_id: str
+    task_id: str
+
+    @classmethod
+    def from_api(cls, event):
+        """Build an Event from a Google Calendar API event resource."""
+        return cls(
+            id=event.get('id'),
+            label=event.get('summary', 'Untitled'),
+            start=parse_event_time(event['start']),
+            end=parse_event_time(event['end']),
+            is_all_day='date' in event['start'],
+            is_headline='@headline' in event.get('description', '').lower(),
+            normalized_label=normalize_text(event.get('summary', '')),
+            calendar_id=event.get('calendar_id', 'primary'),
+            task_id=todoist_task_id(event.get('description', ''))
+        )
+
+    def dates(self):
+        """Return every date the event touches, treating the end time as exclusive."""
+        start_date, end_date = date_span(self.start, self.end, self.is_all_day)
+
+        dates = [start_date]
+        current_date = start_date + timedelta(days=1)
+        while current_date <= end_date:
+            dates.append(current_date)
+            current_date += timedelta(days=1)
+        return dates
+
+
+@dataclass
+class Task:
+    """A Todoist task with its due date, label text and headline flag resolved once."""
+    __slots__ = ('id', 'content', 'text', 'priority', 'due_date', 'is_headline', 'normalized_content',
+                 'link_ids')
+    id: str
+    content: str
+    text: str
+    priority: int
+    due_date: date
+    is_headline: bool
+    normalized_content: str
+    link_ids: tuple
+
+    @classmethod
+    def from_api(cls, task):
+        """Build a Task from a Todoist task, or return None if it has no due date."""
+        due = task.get('due')
+        if not due or not due.get('date'):
+            return None
+
+        labels = task.get('labels', [])
+        labels_str = format_task_labels(labels)
+        text = task['content']
+        if labels_str:
+            text = f"{text} {labels_str}"
+
+        return cls(
+            id=task.get('id'),
+            content=task['content'],
+            text=text,
+            priority=task.get('priority', 1),
+            due_date=parse_iso(due['date']).date(),
+            is_headline='headline' in [label.lower() for label in labels],
+            normalized_content=normalize_text(task['content']),
+            link_ids=task_link_ids(task)
+        )
+
+
+@dataclass
+class OverviewItem:
+    """A holiday, headline event or headline task shown on the yearly overview."""
+    __slots__ = ('date', 'text', 'type')
+    date: date
+    text: str
+    type: str
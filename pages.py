@@ -17,6 +17,9 @@ FONT_HEADER = 'Courier-Bold'
 FONT_BODY = 'Courier'
 FONT_SMALL = 'Courier'
 
+# Bump whenever page layouts change so previously generated months are re-rendered.
+LAYOUT_VERSION = 3
+
 
 class PlannerPage:
     """Base class for all planner pages."""
@@ -32,20 +35,55 @@ class PlannerPage:
             'dest': dest
         })
     
+    def draw_form(self, c, name, draw):
+        """
+        Draw content that is identical on every page of its kind as a form XObject.
+        The form is written once per document and every later page only references it.
+        """
+        if not c.hasForm(name):
+            c.beginForm(name)
+            draw(c)
+            c.endForm()
+        c.doForm(name)
+    
     def render(self, c):
         """Render the page content. Must be implemented by subclasses."""
         raise NotImplementedError
 
 
+def index_yearly_items(yearly_items):
+    """Group overview items by date, keeping their original order within each day."""
+    items_by_date = {}
+    for item in yearly_items:
+        items_by_date.setdefault(item.date, []).append(item)
+    return items_by_date
+
+
 class YearlyOverviewPage(PlannerPage):
     """Yearly overview page showing 3 months in matrix format."""
-    def __init__(self, year, page_num, start_month, current_month=None, yearly_items=None):
+    MAX_ITEM_CHARS = 20
+    ITEM_DISPLAY_MODES = ('first', 'count', 'all')
+    
+    def __init__(self, year, page_num, start_month, current_month=None, yearly_items=None,
+                 items_by_date=None, item_display='first'):
+        """
+        items_by_date: Optional date -> items index; built from yearly_items if not given.
+        item_display: 'first' shows the first item of a day, 'count' adds a "+N" for the
+                     rest, and 'all' joins every item's text.
+        """
+        if item_display not in self.ITEM_DISPLAY_MODES:
+            raise ValueError(f"item_display must be one of {', '.join(self.ITEM_DISPLAY_MODES)}, "
+                             f"not {item_display!r}")
         super().__init__(f'year_{year}_page{page_num}')
         self.year = year
         self.page_num = page_num
         self.start_month = start_month
         self.current_month = current_month
         self.yearly_items = yearly_items or []
+        if items_by_date is None:
+            items_by_date = index_yearly_items(self.yearly_items)
+        self.items_by_date = items_by_date
+        self.item_display = item_display
     
     def render(self, c):
         c.bookmarkPage(self.bookmark_name)
@@ -79,6 +117,25 @@ class YearlyOverviewPage(PlannerPage):
             c.drawString(month_x + 0.1*inch, grid_y + grid_height + 0.15*inch, 
                         month_names[month_idx])
         
+        self.draw_form(c, 'yearly_grid', lambda c: self._draw_grid(
+            c, grid_x, grid_y, grid_width, grid_height, dow_col_width, month_width,
+            num_months, num_rows, row_height, day_labels))
+        
+        for i in range(num_months):
+            month_idx = self.start_month + i - 1
+            if month_idx >= 12:
+                break
+            
+            month_x = grid_x + i * month_width
+            date_col_width = month_width * 0.08
+            event_col_width = month_width * 0.92
+            
+            self._draw_month_column(c, month_x, grid_y, date_col_width, event_col_width,
+                                   row_height, self.year, month_idx + 1, day_labels)
+    
+    def _draw_grid(self, c, grid_x, grid_y, grid_width, grid_height, dow_col_width, month_width,
+                   num_months, num_rows, row_height, day_labels):
+        """Draw the grid lines and weekday labels shared by all four overview pages."""
         c.setStrokeColor(COLOR_GRID)
         c.setLineWidth(0.5)
         
@@ -99,19 +156,8 @@ class YearlyOverviewPage(PlannerPage):
             c.drawString(MARGIN + 0.03*inch, label_y, dow_label)
         
         for i in range(num_months):
-            month_idx = self.start_month + i - 1
-            if month_idx >= 12:
-                break
-            
-            month_x = grid_x + i * month_width
-            date_col_width = month_width * 0.08
-            event_col_width = month_width * 0.92
-            
-            divider_x = month_x + date_col_width
+            divider_x = grid_x + i * month_width + month_width * 0.08
             c.line(divider_x, grid_y, divider_x, grid_y + grid_height)
-            
-            self._draw_month_column(c, month_x, grid_y, date_col_width, event_col_width,
-                                   row_height, self.year, month_idx + 1, day_labels)
     
     def _draw_month_column(self, c, x, y, date_width, event_width, row_height, year, month, day_labels):
         first_day = date(year, month, 1)
@@ -144,13 +190,11 @@ class YearlyOverviewPage(PlannerPage):
                              x + 0.02*inch + day_width + 0.05*inch, cell_y - row_height/2 + 0.1*inch,
                              f'day_{year}_{month:02d}_{day:02d}_schedule')
             
-            items_for_day = [item for item in self.yearly_items if item['date'] == current_date]
+            items_for_day = self.items_by_date.get(current_date)
             if items_for_day:
                 c.setFont(FONT_SMALL, 9)
                 c.setFillColor(COLOR_EVENT)
-                event_text = items_for_day[0]['text']
-                if len(event_text) > 20:
-                    event_text = event_text[:19] + ".."
+                event_text = self._item_text(items_for_day)
                 c.drawString(x + date_width + 0.02*inch, cell_y - row_height/2 - 0.05*inch, event_text)
                 c.setFont(FONT_SMALL, 8)
 
@@ -162,6 +206,24 @@ class YearlyOverviewPage(PlannerPage):
                            f"({week_num})")
                 c.setFont(FONT_SMALL, 8)
 
+    def _item_text(self, items):
+        """Format a day's items for its cell according to item_display."""
+        limit = self.MAX_ITEM_CHARS
+        
+        if self.item_display == 'all':
+            text = ' / '.join(item.text for item in items)
+        else:
+            text = items[0].text
+        
+        suffix = ''
+        if self.item_display == 'count' and len(items) > 1:
+            suffix = f" +{len(items) - 1}"
+            limit -= len(suffix)
+        
+        if len(text) > limit:
+            text = text[:limit - 1] + ".."
+        return text + suffix
+
 
 class MonthlyOverviewPage(PlannerPage):
     """Monthly calendar overview page."""
@@ -276,11 +338,17 @@ class WeeklyPage(PlannerPage):
     def _draw_weekly_grid(self, c, x, y, width, height, week_start):
         time_col_width = 0.65*inch
         day_cols_width = width - time_col_width
-        num_day_cols = 7
-        day_col_width = day_cols_width / num_day_cols
+        day_col_width = day_cols_width / 7
         num_rows = 38
         row_height = height / num_rows
         
+        self.draw_form(c, 'weekly_grid', lambda c: self._draw_grid_lines(
+            c, x, y, width, height, time_col_width, day_col_width, num_rows, row_height))
+        
+        self._draw_events(c, x, y, width, height, time_col_width, day_col_width, row_height)
+    
+    def _draw_grid_lines(self, c, x, y, width, height, time_col_width, day_col_width, num_rows, row_height):
+        """Draw the column headers, grid and time labels shared by every week."""
         c.setFont(FONT_HEADER, 12)
         header_y = y + height + 0.1*inch
         headers = ["Time", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
@@ -299,7 +367,7 @@ class WeeklyPage(PlannerPage):
         
         c.line(x + time_col_width, y, x + time_col_width, y + height)
         
-        for i in range(1, num_day_cols + 1):
+        for i in range(1, 8):
             line_x = x + time_col_width + i * day_col_width
             c.line(line_x, y, line_x, y + height)
         
@@ -315,25 +383,23 @@ class WeeklyPage(PlannerPage):
             time_str = f"{hour:02d}:{minute:02d}-{next_hour:02d}:{next_minute:02d}"
             row_y = y + height - (i + 1.5) * row_height - 0.05*inch
             c.drawString(x + 0.02*inch, row_y, time_str)
-        
-        self._draw_events(c, x, y, width, height, time_col_width, day_col_width, row_height)
     
     def _draw_events(self, c, x, y, width, height, time_col_width, day_col_width, row_height):
         """Draw events on the weekly grid."""
         c.setFont(FONT_SMALL, 8)
         
         for event in self.events:
-            if event['is_all_day']:
+            if event.is_all_day:
                 continue
             
-            event_date = event['start'].date()
+            event_date = event.start.date()
             days_from_start = (event_date - self.week_start_date).days
             
             if 0 <= days_from_start < 7:
-                start_hour = event['start'].hour
-                start_minute = event['start'].minute
-                end_hour = event['end'].hour
-                end_minute = event['end'].minute
+                start_hour = event.start.hour
+                start_minute = event.start.minute
+                end_hour = event.end.hour
+                end_minute = event.end.minute
                 
                 if start_hour >= 5 and start_hour < 23:
                     start_row = ((start_hour - 5) * 2) + (1 if start_minute >= 30 else 0)
@@ -349,7 +415,7 @@ class WeeklyPage(PlannerPage):
                     c.rect(event_x, event_y, event_width, event_height, fill=1, stroke=0)
                     
                     c.setFillColor(COLOR_EVENT)
-                    label = event['label']
+                    label = event.label
                     if len(label) > 15:
                         label = label[:12] + "..."
                     
@@ -423,13 +489,20 @@ class DailySchedulePage(PlannerPage):
         c.setFillColor(COLOR_TEXT)
     
     def _draw_daily_schedule(self, c, x, y, width, height):
-        c.setFont(FONT_SMALL, 11)
-        
         start_hour = 5
         end_hour = 23
         num_hours = end_hour - start_hour
         hour_height = height / num_hours
+        time_col_width = 0.6*inch
         
+        self.draw_form(c, 'daily_schedule_grid', lambda c: self._draw_hour_grid(
+            c, x, y, width, height, time_col_width, hour_height, start_hour, num_hours))
+        
+        self._draw_events(c, x, y, width, height, time_col_width, hour_height, start_hour)
+    
+    def _draw_hour_grid(self, c, x, y, width, height, time_col_width, hour_height, start_hour, num_hours):
+        """Draw the hour lines and labels shared by every day."""
+        c.setFont(FONT_SMALL, 11)
         c.setStrokeColor(COLOR_GRID)
         c.setLineWidth(0.5)
         
@@ -437,7 +510,6 @@ class DailySchedulePage(PlannerPage):
             line_y = y + height - i * hour_height
             c.line(x, line_y, x + width, line_y)
         
-        time_col_width = 0.6*inch
         c.line(x + time_col_width, y, x + time_col_width, y + height)
         
         for i in range(num_hours):
@@ -445,21 +517,19 @@ class DailySchedulePage(PlannerPage):
             time_str = f"{hour:02d}:00"
             time_y = y + height - i * hour_height - 0.15*inch
             c.drawString(x + 0.05*inch, time_y, time_str)
-        
-        self._draw_events(c, x, y, width, height, time_col_width, hour_height, start_hour)
     
     def _draw_events(self, c, x, y, width, height, time_col_width, hour_height, start_hour):
         """Draw events on the daily schedule."""
         c.setFont(FONT_SMALL, 9)
         
         for event in self.events:
-            if event['is_all_day']:
+            if event.is_all_day:
                 continue
             
-            start_hour_val = event['start'].hour
-            start_minute = event['start'].minute
-            end_hour_val = event['end'].hour
-            end_minute = event['end'].minute
+            start_hour_val = event.start.hour
+            start_minute = event.start.minute
+            end_hour_val = event.end.hour
+            end_minute = event.end.minute
             
             if start_hour_val >= start_hour and start_hour_val < 23:
                 hours_from_start = start_hour_val - start_hour
@@ -478,13 +548,15 @@ class DailySchedulePage(PlannerPage):
                 c.rect(event_x, event_y - event_height, event_width, event_height, fill=1, stroke=0)
                 
                 c.setFillColor(COLOR_EVENT)
-                c.drawString(event_x + 0.05*inch, event_y - 0.15*inch, event['label'])
+                c.drawString(event_x + 0.05*inch, event_y - 0.15*inch, event.label)
         
         c.setFillColor(COLOR_TEXT)
 
 
 class DailyTasksPage(PlannerPage):
     """Daily tasks and summary page."""
+    TASK_LINES = 8
+    
     def __init__(self, date_obj, tasks=None, headline_events=None):
         self.date_obj = date_obj
         self.tasks = tasks or []
@@ -497,27 +569,42 @@ class DailyTasksPage(PlannerPage):
         y = PAGE_HEIGHT - 0.6*inch
         self._draw_daily_header(c, y)
         
+        sections = self._section_layout()
+        layout_name = 'daily_tasks_headline' if self.headline_events else 'daily_tasks'
+        self.draw_form(c, layout_name, lambda c: self._draw_sections(c, sections))
+        
+        if self.headline_events:
+            self._draw_headline_events(c, *sections['headline'], self.headline_events)
+        self._draw_tasks(c, *sections['tasks'], self.tasks)
+    
+    def _section_layout(self):
+        """Return the (x, y, width, height) of each section, which depends only on whether there are headlines."""
+        sections = {}
         section_y = PAGE_HEIGHT - 1.2*inch
+        width = PAGE_WIDTH - 2*MARGIN
         
         if self.headline_events:
             headline_height = 0.6*inch
-            self._draw_headline_section(c, MARGIN, section_y, PAGE_WIDTH - 2*MARGIN, 
-                                       headline_height, self.headline_events)
+            sections['headline'] = (MARGIN, section_y, width, headline_height)
             section_y -= headline_height + 0.2*inch
         
         remaining_height = section_y - MARGIN - 0.2*inch
         section_height = remaining_height / 3
         
-        self._draw_section(c, MARGIN, section_y, PAGE_WIDTH - 2*MARGIN, 
-                          section_height, "Top 3 Priorities", 3)
-        
+        sections['priorities'] = (MARGIN, section_y, width, section_height)
         section_y -= section_height + 0.2*inch
-        self._draw_tasks_section(c, MARGIN, section_y, PAGE_WIDTH - 2*MARGIN, 
-                          section_height, "Today's Tasks", self.tasks)
-        
+        sections['tasks'] = (MARGIN, section_y, width, section_height)
         section_y -= section_height + 0.2*inch
-        self._draw_section(c, MARGIN, section_y, PAGE_WIDTH - 2*MARGIN, 
-                          section_height, "Daily Summary", 0)
+        sections['summary'] = (MARGIN, section_y, width, section_height)
+        return sections
+    
+    def _draw_sections(self, c, sections):
+        """Draw the section boxes, titles and ruled lines."""
+        if 'headline' in sections:
+            self._draw_headline_section(c, *sections['headline'])
+        self._draw_section(c, *sections['priorities'], "Top 3 Priorities", 3)
+        self._draw_section(c, *sections['tasks'], "Today's Tasks", self.TASK_LINES)
+        self._draw_section(c, *sections['summary'], "Daily Summary", 0)
     
     def _draw_daily_header(self, c, y):
         c.setFont(FONT_HEADER, 14)
@@ -565,8 +652,8 @@ class DailyTasksPage(PlannerPage):
         self.add_link(link_x, y - 0.1*inch, link_x + 0.6*inch, y + 0.15*inch, 'notes')
         c.setFillColor(COLOR_TEXT)
     
-    def _draw_headline_section(self, c, x, y, width, height, headline_events):
-        """Draw headline events section."""
+    def _draw_headline_section(self, c, x, y, width, height):
+        """Draw the headline events box."""
         c.setFont(FONT_HEADER, 11)
         c.setFillColor(COLOR_EVENT)
         c.drawString(x, y + height - 0.2*inch, "* Headline Events")
@@ -574,16 +661,19 @@ class DailyTasksPage(PlannerPage):
         c.setStrokeColor(COLOR_GRID)
         c.setLineWidth(0.5)
         c.rect(x, y, width, height)
-        
+    
+    def _draw_headline_events(self, c, x, y, width, height, headline_events):
+        """Draw the day's headline events inside the headline box."""
         c.setFont(FONT_SMALL, 11)
         c.setFillColor(COLOR_TEXT)
         
         for i, event in enumerate(headline_events[:2]):
             event_y = y + height - 0.4*inch - i * 0.15*inch
-            c.drawString(x + 0.1*inch, event_y, f"- {event['text']}")
+            c.drawString(x + 0.1*inch, event_y, f"- {event.label}")
     
     def _draw_section(self, c, x, y, width, height, title, num_lines):
         c.setFont(FONT_HEADER, 11)
+        c.setFillColor(COLOR_TEXT)
         c.drawString(x, y + height - 0.2*inch, title)
         
         c.setStrokeColor(COLOR_GRID)
@@ -596,35 +686,25 @@ class DailyTasksPage(PlannerPage):
                 line_y = y + height - 0.3*inch - i * line_height
                 c.line(x, line_y, x + width, line_y)
     
-    def _draw_tasks_section(self, c, x, y, width, height, title, tasks):
-        """Draw tasks section with actual tasks from Todoist."""
-        c.setFont(FONT_HEADER, 11)
-        c.drawString(x, y + height - 0.2*inch, title)
-        
-        c.setStrokeColor(COLOR_GRID)
-        c.setLineWidth(0.5)
-        c.rect(x, y, width, height)
-        
-        num_lines = 8
-        line_height = (height - 0.3*inch) / num_lines
-        
-        for i in range(1, num_lines):
-            line_y = y + height - 0.3*inch - i * line_height
-            c.line(x, line_y, x + width, line_y)
+    def _draw_tasks(self, c, x, y, width, height, tasks):
+        """Draw tasks from Todoist on the ruled lines of the tasks section."""
+        line_height = (height - 0.3*inch) / self.TASK_LINES
         
         c.setFont(FONT_SMALL, 10)
         c.setFillColor(COLOR_TEXT)
         
-        for i, task in enumerate(tasks[:num_lines]):
+        for i, task in enumerate(tasks[:self.TASK_LINES]):
             task_y = y + height - 0.3*inch - i * line_height - 0.15*inch
-            c.drawString(x + 0.1*inch, task_y, f"[ ] {task['text']}")
+            c.drawString(x + 0.1*inch, task_y, f"[ ] {task.text}")
 
 
 class NotesPage(PlannerPage):
     """Dot-grid notes page."""
-    def __init__(self, page_num):
+    def __init__(self, page_num, dot_spacing=0.2*inch, dot_radius=0.5):
         super().__init__('notes')
         self.page_num = page_num
+        self.dot_spacing = dot_spacing
+        self.dot_radius = dot_radius
     
     def render(self, c):
         if self.page_num == 1:
@@ -633,19 +713,30 @@ class NotesPage(PlannerPage):
         c.setFont(FONT_HEADER, 12)
         c.drawString(MARGIN, PAGE_HEIGHT - 0.5*inch, f"Notes ({self.page_num}/10)")
         
-        dot_spacing = 0.2*inch
+        self.draw_form(c, f'notes_dots_{self.dot_spacing:g}_{self.dot_radius:g}', self._draw_dots)
+    
+    def _draw_dots(self, c):
+        """
+        Draw the dot grid as a single stroked path. Each row is one line with a
+        zero-length, round-capped dash every dot_spacing, which renders as a dot.
+        """
         start_x = MARGIN
         start_y = MARGIN + 0.5*inch
         end_x = PAGE_WIDTH - MARGIN
         end_y = PAGE_HEIGHT - 0.8*inch
         
-        c.setFillColor(COLOR_GRID)
-        x = start_x
-        while x <= end_x:
-            y = start_y
-            while y <= end_y:
-                c.circle(x, y, 0.5, fill=1, stroke=0)
-                y += dot_spacing
-            x += dot_spacing
+        columns = int((end_x - start_x) / self.dot_spacing + 1e-6)
+        rows = int((end_y - start_y) / self.dot_spacing + 1e-6)
+        row_end_x = start_x + columns * self.dot_spacing + 0.01
         
-        c.setFillColor(COLOR_TEXT)
\ No newline at end of file
+        c.setStrokeColor(COLOR_GRID)
+        c.setLineWidth(2 * self.dot_radius)
+        c.setLineCap(1)
+        c.setDash([0, self.dot_spacing])
+        
+        path = c.beginPath()
+        for row in range(rows + 1):
+            y = start_y + row * self.dot_spacing
+            path.moveTo(start_x, y)
+            path.lineTo(row_end_x, y)
+        c.drawPath(path, stroke=1, fill=0)
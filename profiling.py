@@ -0,0 +1,173 @@
+"""
+Optional cProfile/tracemalloc profiling for the command-line entry points.
+
+enable() turns profiling on for the process. Each profile(name) block then writes
+<name>.prof (and <name>.tracemalloc with memory tracing) into a timestamped run
+directory, and write_summary() combines them into summary.txt. When profiling is
+off, profile() does nothing. Blocks do not nest; an inner block is ignored.
+cProfile only sees the thread that enters a block, so work handed to other threads
+should be wrapped with thread_target() to be included in the block's dump.
+"""
+from contextlib import contextmanager
+import cProfile
+import functools
+import glob
+import io
+import linecache
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+import metrics
+
+_settings = None
+_active = False
+_peak_snapshot = None
+_thread_profilers = []
+_thread_lock = threading.Lock()
+
+
+def add_arguments(parser):
+    """Add the --profile and --profile-memory options to an argparse parser."""
+    parser.add_argument('--profile', nargs='?', const='profiles', metavar='DIR',
+                       help='Profile the run with cProfile, writing dumps and a summary under DIR '
+                            '(default: profiles/)')
+    parser.add_argument('--profile-memory', action='store_true',
+                       help='With --profile, also trace memory allocations with tracemalloc')
+
+
+def enable_from_args(args):
+    """Enable profiling if --profile or --profile-memory was given."""
+    if args.profile or args.profile_memory:
+        enable(args.profile or 'profiles', memory=args.profile_memory)
+
+
+def enable(base_dir='profiles', memory=False):
+    """Turn profiling on, writing into a new timestamped directory under base_dir."""
+    run_dir = os.path.join(base_dir, time.strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(run_dir, exist_ok=True)
+    configure({'dir': run_dir, 'memory': memory})
+    print(f"Profiling to {run_dir}/")
+    return run_dir
+
+
+def settings():
+    """Return the current settings, to hand to worker processes, or None if profiling is off."""
+    return _settings
+
+
+def configure(new_settings):
+    """Apply settings from settings(), typically in a worker process initializer."""
+    global _settings
+    _settings = new_settings
+    if new_settings and new_settings['memory'] and not tracemalloc.is_tracing():
+        tracemalloc.start(10)
+
+
+def checkpoint():
+    """
+    Keep a memory snapshot if more memory is traced now than at the block's last checkpoint.
+    Call this where a block holds the most memory (e.g. just before writing a PDF).
+    """
+    global _peak_snapshot
+    if not (_active and _settings['memory']):
+        return
+    current = tracemalloc.get_traced_memory()[0]
+    if _peak_snapshot is None or current > _peak_snapshot[0]:
+        _peak_snapshot = (current, tracemalloc.take_snapshot())
+
+
+def thread_target(fn):
+    """
+    Wrap fn, which will run on another thread, so its time is added to the active block's
+    dump. Returns fn unchanged when no block is active.
+    """
+    if not _active:
+        return fn
+    
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler, and the block's already sees every thread.
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with _thread_lock:
+                _thread_profilers.append(profiler)
+    return run
+
+
+@contextmanager
+def profile(name):
+    """Profile a block of work, writing <name>.prof into the run directory."""
+    global _active, _peak_snapshot
+    if _settings is None or _active:
+        yield
+        return
+
+    _active = True
+    _peak_snapshot = None
+    if _settings['memory']:
+        tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        stats = pstats.Stats(profiler)
+        with _thread_lock:
+            for thread_profiler in _thread_profilers:
+                stats.add(thread_profiler)
+            _thread_profilers.clear()
+        stats.dump_stats(os.path.join(_settings['dir'], f"{name}.prof"))
+        if _settings['memory']:
+            checkpoint()
+            _peak_snapshot[1].dump(os.path.join(_settings['dir'], f"{name}.tracemalloc"))
+            metrics.record('peak_traced_bytes', tracemalloc.get_traced_memory()[1], block=name)
+        _active = False
+        _peak_snapshot = None
+
+
+def summary_text(run_dir, limit=25):
+    """Summarise every dump in run_dir: top functions by cumulative time and top allocation sites."""
+    out = io.StringIO()
+    prof_files = sorted(glob.glob(os.path.join(run_dir, '*.prof')))
+    if prof_files:
+        out.write(f"Top {limit} functions by cumulative time across {len(prof_files)} profile(s)\n")
+        stats = pstats.Stats(*prof_files, stream=out)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+
+    mem_files = sorted(glob.glob(os.path.join(run_dir, '*.tracemalloc')))
+    if mem_files:
+        sizes = {}
+        counts = {}
+        for path in mem_files:
+            for stat in tracemalloc.Snapshot.load(path).statistics('lineno'):
+                frame = stat.traceback[0]
+                key = (frame.filename, frame.lineno)
+                sizes[key] = sizes.get(key, 0) + stat.size
+                counts[key] = counts.get(key, 0) + stat.count
+        out.write(f"Top {limit} allocation sites at peak, summed across {len(mem_files)} snapshot(s)\n\n")
+        for (filename, lineno), size in sorted(sizes.items(), key=lambda item: -item[1])[:limit]:
+            line = linecache.getline(filename, lineno).strip()
+            out.write(f"{size / 1024:10.1f} KiB {counts[(filename, lineno)]:8d} blocks  "
+                      f"{os.path.basename(filename)}:{lineno}  {line}\n")
+    return out.getvalue()
+
+
+def write_summary():
+    """Write summary.txt for the current run directory and print where it went."""
+    if _settings is None:
+        return
+    path = os.path.join(_settings['dir'], 'summary.txt')
+    with open(path, 'w') as f:
+        f.write(summary_text(_settings['dir']))
+    print(f"Profile summary written to {path}")
@@ -1,6 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
 import os
+import shutil
 import subprocess
 import sys
+import tarfile
+import threading
 from datetime import datetime
 import paramiko
 from pathlib import Path
@@ -8,40 +14,135 @@ import uuid
 import json
 from dotenv import load_dotenv
 import time
+import delta_sync
+import metrics
+import profiling
 
 load_dotenv()
 
+SYNC_MANIFEST_FILE = '.sync_manifest.json'
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a local file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_sync_manifest(directory_path):
+    """Load the {host: {filename: {'sha256', 'doc_id'}}} record of previous uploads."""
+    try:
+        with open(os.path.join(directory_path, SYNC_MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_sync_manifest(directory_path, manifest):
+    """Write the sync manifest, replacing the old file atomically."""
+    path = os.path.join(directory_path, SYNC_MANIFEST_FILE)
+    try:
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        print(f"⚠ Could not save sync manifest: {e}")
+
+def new_document_metadata(name, parent_id=""):
+    """Return the .metadata of a newly uploaded PDF document."""
+    return {
+        "deleted": False,
+        "lastModified": str(int(datetime.now().timestamp() * 1000)),
+        "metadatamodified": False,
+        "modified": False,
+        "parent": parent_id,
+        "pinned": False,
+        "synced": False,
+        "type": "DocumentType",
+        "version": 1,
+        "visibleName": name
+    }
+
+def new_document_content():
+    """Return the .content of a newly uploaded PDF document."""
+    return {
+        "extraMetadata": {},
+        "fileType": "pdf",
+        "fontName": "",
+        "lastOpenedPage": 0,
+        "lineHeight": -1,
+        "margins": 100,
+        "orientation": "portrait",
+        "pageCount": 0,
+        "pages": [],
+        "textScale": 1,
+        "transform": {}
+    }
+
+class _CountingWriter:
+    """File-like wrapper that counts the bytes written through it."""
+    def __init__(self, f):
+        self.f = f
+        self.bytes = 0
+    
+    def write(self, data):
+        self.f.write(data)
+        self.bytes += len(data)
+        return len(data)
+
 class RemarkableSync:
-    def __init__(self, host=None, password=None):
+    def __init__(self, host=None, password=None, upload_workers=None, delta=None, batch=None):
         """
         Initialize reMarkable sync.
         host: IP address (reads from REMARKABLE_HOST env var if not provided)
         password: SSH password (reads from REMARKABLE_PASSWORD env var if not provided)
+        upload_workers: Number of PDFs uploaded in parallel, each over its own SFTP channel
+                       (reads from REMARKABLE_UPLOAD_WORKERS env var if not provided, default 1)
+        delta: If True, send only the changed blocks of PDFs that were uploaded before
+              (reads from REMARKABLE_DELTA_SYNC env var if not provided, default off)
+        batch: If True, send all changed PDFs and their metadata as one tar stream over a
+              single SSH command (reads from REMARKABLE_BATCH_UPLOAD env var if not provided,
+              default off)
         """
         self.host = host or os.getenv('REMARKABLE_HOST', '10.11.99.1')
         self.password = password or os.getenv('REMARKABLE_PASSWORD')
+        self.upload_workers = upload_workers or int(os.getenv('REMARKABLE_UPLOAD_WORKERS', '1'))
+        if delta is None:
+            delta = os.getenv('REMARKABLE_DELTA_SYNC', 'false').lower() in ('1', 'true', 'yes')
+        self.delta = delta
+        if batch is None:
+            batch = os.getenv('REMARKABLE_BATCH_UPLOAD', 'false').lower() in ('1', 'true', 'yes')
+        self.batch = batch
+        self.delta_cache_dir = None
+        self.remote_pdf_checksums = {}
+        self.bytes_sent = 0
+        self._bytes_lock = threading.Lock()
         self.username = 'root'
         self.remote_path = '/home/root/.local/share/remarkable/xochitl/'
         self.ssh = None
         self.sftp = None
+        self.metadata = None
+        self.index = None
     
     def connect(self, retries=3, retry_delay=2):
         """Establish SSH connection with retry logic."""
         for attempt in range(retries):
             try:
                 print(f"Connecting to {self.host}... (attempt {attempt + 1}/{retries})")
-                self.ssh = paramiko.SSHClient()
-                self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                self.ssh.connect(
-                    self.host, 
-                    username=self.username, 
-                    password=self.password,
-                    timeout=15,
-                    banner_timeout=15,
-                    auth_timeout=15
-                )
-                self.sftp = self.ssh.open_sftp()
+                with metrics.span('connect'):
+                    self.ssh = paramiko.SSHClient()
+                    self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                    self.ssh.connect(
+                        self.host, 
+                        username=self.username, 
+                        password=self.password,
+                        timeout=15,
+                        banner_timeout=15,
+                        auth_timeout=15
+                    )
+                    self.sftp = self.ssh.open_sftp()
                 print("✓ Connected successfully")
+                self.load_index()
                 return True
             except Exception as e:
                 print(f"✗ Connection attempt {attempt + 1} failed: {e}")
@@ -95,31 +196,79 @@ class RemarkableSync:
         with self.sftp.open(remote_content, 'w') as f:
             f.write(content_str)
         
+        if self.index is not None:
+            self._index_entry(folder_id, metadata)
         print(f"✓ Created folder: {folder_name}")
         return folder_id
     
-    def find_folder(self, folder_name, parent_id=""):
-        """Find a folder by name and return its UUID, or None if not found."""
+    def load_index(self):
+        """
+        Read every document and folder's metadata once and index it by (parent, name, type).
+        All metadata is read with a single remote command; per-file SFTP reads are the fallback.
+        """
         try:
-            files = self.sftp.listdir(self.remote_path)
-            metadata_files = [f for f in files if f.endswith('.metadata')]
-            
-            for metadata_file in metadata_files:
-                try:
-                    with self.sftp.open(f"{self.remote_path}{metadata_file}", 'r') as f:
-                        metadata = json.load(f)
-                        if (metadata.get('visibleName') == folder_name and 
-                            metadata.get('type') == 'CollectionType' and
-                            metadata.get('parent') == parent_id and
-                            not metadata.get('deleted', False)):
-                            return metadata_file.replace('.metadata', '')
-                except:
-                    continue
-            
-            return None
+            metadata = self._read_all_metadata()
         except Exception as e:
-            print(f"Error finding folder: {e}")
-            return None
+            print(f"⚠ Batched metadata read failed ({e}), reading files individually")
+            try:
+                metadata = self._read_metadata_files()
+            except Exception as e:
+                print(f"Error reading metadata: {e}")
+                metadata = {}
+        
+        self.metadata = {}
+        self.index = {}
+        for doc_id, entry in metadata.items():
+            self._index_entry(doc_id, entry)
+        print(f"✓ Indexed {len(self.metadata)} items on device")
+    
+    def _read_all_metadata(self):
+        """Return {uuid: metadata} using one shell command that prints each file on its own line."""
+        command = (f"cd '{self.remote_path}' && for f in *.metadata; do "
+                   f"[ -f \"$f\" ] || continue; printf '%s\\t' \"$f\"; tr -d '\\n' < \"$f\"; echo; done")
+        stdin, stdout, stderr = self.ssh.exec_command(command)
+        output = stdout.read().decode('utf-8', 'replace')
+        status = stdout.channel.recv_exit_status()
+        if status != 0:
+            raise RuntimeError(f"exit status {status}: {stderr.read().decode('utf-8', 'replace').strip()}")
+        
+        metadata = {}
+        for line in output.splitlines():
+            name, _, body = line.partition('\t')
+            try:
+                metadata[name[:-len('.metadata')]] = json.loads(body)
+            except ValueError:
+                continue
+        return metadata
+    
+    def _read_metadata_files(self):
+        """Return {uuid: metadata} by opening each .metadata file over SFTP."""
+        metadata = {}
+        for metadata_file in self.sftp.listdir(self.remote_path):
+            if not metadata_file.endswith('.metadata'):
+                continue
+            try:
+                with self.sftp.open(f"{self.remote_path}{metadata_file}", 'r') as f:
+                    metadata[metadata_file[:-len('.metadata')]] = json.load(f)
+            except Exception:
+                continue
+        return metadata
+    
+    def _index_entry(self, doc_id, metadata):
+        """Record an item's metadata, keeping the first live item for each (parent, name, type)."""
+        self.metadata[doc_id] = metadata
+        if not metadata.get('deleted', False):
+            key = (metadata.get('parent'), metadata.get('visibleName'), metadata.get('type'))
+            self.index.setdefault(key, doc_id)
+    
+    def _lookup(self, name, parent_id, item_type):
+        if self.index is None:
+            self.load_index()
+        return self.index.get((parent_id, name, item_type))
+    
+    def find_folder(self, folder_name, parent_id=""):
+        """Find a folder by name and return its UUID, or None if not found."""
+        return self._lookup(folder_name, parent_id, 'CollectionType')
     
     def get_or_create_folder(self, folder_name, parent_id=""):
         """Get existing folder UUID or create new one."""
@@ -132,34 +281,100 @@ class RemarkableSync:
     
     def find_document(self, doc_name, parent_id=""):
         """Find a document by name in a folder and return its UUID."""
+        return self._lookup(doc_name, parent_id, 'DocumentType')
+    
+    def remote_checksums(self, doc_ids):
+        """
+        Return {uuid: sha256} for the given documents' PDFs, computed on the device in one
+        command. Documents without a PDF are left out. Returns None if sha256sum is unavailable.
+        """
+        if not doc_ids:
+            return {}
+        files = ' '.join(f"{doc_id}.pdf" for doc_id in doc_ids)
+        stdin, stdout, stderr = self.ssh.exec_command(f"cd '{self.remote_path}' && sha256sum {files}")
+        output = stdout.read().decode('utf-8', 'replace')
+        status = stdout.channel.recv_exit_status()
+        if status != 0 and not output:
+            return None
+        
+        checksums = {}
+        for line in output.splitlines():
+            digest, _, name = line.partition('  ')
+            if name.endswith('.pdf'):
+                checksums[name[:-len('.pdf')]] = digest
+        self.remote_pdf_checksums.update(checksums)
+        return checksums
+    
+    def _delta_basis(self, local_pdf_path, doc_id):
+        """Return the cached copy of this PDF's last upload if it is known to match the device's copy."""
+        if not self.delta_cache_dir:
+            return None
+        cached = os.path.join(self.delta_cache_dir, os.path.basename(local_pdf_path))
+        expected = self.remote_pdf_checksums.get(doc_id)
+        if expected and os.path.exists(cached) and file_sha256(cached) == expected:
+            return cached
+        return None
+    
+    def _put_delta(self, sftp, local_pdf_path, basis_path, remote_pdf):
+        """
+        Update remote_pdf, whose content equals basis_path, to local_pdf_path by sending only
+        the blocks that changed. The device rebuilds the file beside the old one and renames
+        it into place once its SHA-256 checks out. Returns the bytes sent, or None on failure.
+        """
+        payload_path = f"{remote_pdf}.delta"
         try:
-            files = self.sftp.listdir(self.remote_path)
-            metadata_files = [f for f in files if f.endswith('.metadata')]
-            
-            for metadata_file in metadata_files:
-                try:
-                    with self.sftp.open(f"{self.remote_path}{metadata_file}", 'r') as f:
-                        metadata = json.load(f)
-                        if (metadata.get('visibleName') == doc_name and 
-                            metadata.get('type') == 'DocumentType' and
-                            metadata.get('parent') == parent_id and
-                            not metadata.get('deleted', False)):
-                            return metadata_file.replace('.metadata', '')
-                except:
-                    continue
+            with open(basis_path, 'rb') as f:
+                old = f.read()
+            with open(local_pdf_path, 'rb') as f:
+                new = f.read()
+            ops = delta_sync.compute_delta(old, new)
+            if ops is None:
+                return None
             
-            return None
+            payload, placed = delta_sync.pack_literals(ops)
+            with sftp.open(payload_path, 'wb') as f:
+                f.set_pipelined(True)
+                f.write(payload)
+            script = delta_sync.device_script(placed, remote_pdf, payload_path, f"{remote_pdf}.tmp",
+                                              hashlib.sha256(new).hexdigest())
+            stdin, stdout, stderr = self.ssh.exec_command('sh')
+            stdin.write(script)
+            stdin.channel.shutdown_write()
+            status = stdout.channel.recv_exit_status()
+            if status != 0:
+                raise RuntimeError(f"rebuild exited with status {status}")
         except Exception as e:
-            print(f"Error finding document: {e}")
+            print(f"⚠ Delta update of {Path(local_pdf_path).stem} failed ({e}), uploading the whole file")
+            for leftover in (payload_path, f"{remote_pdf}.tmp"):
+                try:
+                    sftp.remove(leftover)
+                except Exception:
+                    pass
             return None
+        
+        print(f"Sent {len(payload)} of {len(new)} bytes for {Path(local_pdf_path).stem}")
+        return len(payload) + len(script)
     
-    def upload_pdf(self, local_pdf_path, parent_id="", update_existing=True):
+    def _cache_upload(self, local_pdf_path):
+        """Keep a copy of what was just uploaded as the basis for the next delta."""
+        if not self.delta_cache_dir:
+            return
+        cached = os.path.join(self.delta_cache_dir, os.path.basename(local_pdf_path))
+        try:
+            shutil.copyfile(local_pdf_path, f"{cached}.tmp")
+            os.replace(f"{cached}.tmp", cached)
+        except OSError as e:
+            print(f"⚠ Could not cache {local_pdf_path} for delta sync: {e}")
+    
+    def upload_pdf(self, local_pdf_path, parent_id="", update_existing=True, sftp=None):
         """
         Upload a PDF to reMarkable via SSH.
         
         update_existing: If True, updates existing file in-place (preserves annotations).
                         If False, creates new file (duplicates).
+        sftp: SFTP channel to use instead of the connection's default one.
         """
+        sftp = sftp or self.sftp
         pdf_name = Path(local_pdf_path).stem
         
         doc_id = None
@@ -177,59 +392,219 @@ class RemarkableSync:
             remote_metadata = f"{self.remote_path}{doc_id}.metadata"
             remote_content = f"{self.remote_path}{doc_id}.content"
             
-            self.sftp.put(local_pdf_path, remote_pdf)
+            basis = self._delta_basis(local_pdf_path, doc_id)
+            with metrics.span('upload'):
+                sent = self._put_delta(sftp, local_pdf_path, basis, remote_pdf) if basis else None
+                if sent is None:
+                    sftp.put(local_pdf_path, remote_pdf)
+                    sent = os.path.getsize(local_pdf_path)
+            metrics.count('upload_bytes', sent, service='remarkable')
+            with self._bytes_lock:
+                self.bytes_sent += sent
+            self._cache_upload(local_pdf_path)
             
             try:
-                with self.sftp.open(remote_metadata, 'r') as f:
-                    metadata = json.load(f)
+                if self.metadata is not None and doc_id in self.metadata:
+                    metadata = dict(self.metadata[doc_id])
+                else:
+                    with sftp.open(remote_metadata, 'r') as f:
+                        metadata = json.load(f)
                 metadata['lastModified'] = str(int(datetime.now().timestamp() * 1000))
                 metadata['modified'] = True
             except:
-                metadata = {
-                    "deleted": False,
-                    "lastModified": str(int(datetime.now().timestamp() * 1000)),
-                    "metadatamodified": False,
-                    "modified": False,
-                    "parent": parent_id,
-                    "pinned": False,
-                    "synced": False,
-                    "type": "DocumentType",
-                    "version": 1,
-                    "visibleName": pdf_name
-                }
+                metadata = new_document_metadata(pdf_name, parent_id)
             
-            with self.sftp.open(remote_metadata, 'w') as f:
+            with sftp.open(remote_metadata, 'w') as f:
                 f.write(json.dumps(metadata))
+            if self.index is not None:
+                self._index_entry(doc_id, metadata)
             
             try:
-                with self.sftp.open(remote_content, 'r') as f:
+                with sftp.open(remote_content, 'r') as f:
                     content = json.load(f)
             except:
-                content = {
-                    "extraMetadata": {},
-                    "fileType": "pdf",
-                    "fontName": "",
-                    "lastOpenedPage": 0,
-                    "lineHeight": -1,
-                    "margins": 100,
-                    "orientation": "portrait",
-                    "pageCount": 0,
-                    "pages": [],
-                    "textScale": 1,
-                    "transform": {}
-                }
+                content = new_document_content()
             
-            with self.sftp.open(remote_content, 'w') as f:
+            with sftp.open(remote_content, 'w') as f:
                 f.write(json.dumps(content))
             
+            metrics.count('files_uploaded', service='remarkable')
             print(f"✓ Uploaded {pdf_name}")
             return True
             
         except Exception as e:
+            metrics.count('upload_errors', service='remarkable')
             print(f"✗ Error uploading {pdf_name}: {e}")
             return False
     
-    def upload_directory(self, directory_path, folder_name=None, update_existing=True, fail_on_error=False):
+    def _changed_files(self, pdf_files, parent_id, uploaded):
+        """Return [(pdf_file, sha256)] for the PDFs that differ from what is on the device."""
+        checksums = {pdf_file: file_sha256(pdf_file) for pdf_file in pdf_files}
+        doc_ids = {pdf_file: self.find_document(pdf_file.stem, parent_id) for pdf_file in pdf_files}
+        remote = self.remote_checksums([doc_id for doc_id in doc_ids.values() if doc_id])
+        
+        pending = []
+        for pdf_file in pdf_files:
+            doc_id = doc_ids[pdf_file]
+            if remote is not None:
+                unchanged = doc_id is not None and remote.get(doc_id) == checksums[pdf_file]
+            else:
+                previous = uploaded.get(pdf_file.name, {})
+                unchanged = doc_id is not None and previous == {'sha256': checksums[pdf_file], 'doc_id': doc_id}
+            
+            if unchanged:
+                print(f"Unchanged: {pdf_file.stem}")
+                metrics.count('files_skipped', service='remarkable')
+            else:
+                pending.append((pdf_file, checksums[pdf_file]))
+        return pending
+    
+    def _upload_batch(self, pdf_files, parent_id, update_existing):
+        """
+        Upload PDFs with their .metadata and .content in one gzipped tar stream, piped into
+        tar on the device through a single SSH command. Everything is unpacked into a staging
+        directory beside the xochitl one (same filesystem) and only then renamed into place,
+        so an interrupted transfer leaves the device's documents untouched. Each document's
+        files are renamed as a group (.metadata last) and the device reports every document
+        that made it, so a failure partway only leaves the rest to upload again. Existing
+        .content files are kept. Returns the uploaded files.
+        
+        PDFs that can be sent as a block delta are deliberately not passed in (see
+        _upload_files): the delta is usually far smaller than the whole file.
+        """
+        documents = []
+        for pdf_file in pdf_files:
+            doc_id = self.find_document(pdf_file.stem, parent_id) if update_existing else None
+            if doc_id and doc_id in self.metadata:
+                print(f"Updating existing document: {pdf_file.stem} (preserving annotations)")
+                metadata = dict(self.metadata[doc_id])
+                metadata['lastModified'] = str(int(datetime.now().timestamp() * 1000))
+                metadata['modified'] = True
+            else:
+                print(f"Creating new document: {pdf_file.stem}")
+                doc_id = str(uuid.uuid4())
+                metadata = new_document_metadata(pdf_file.stem, parent_id)
+            documents.append((pdf_file, doc_id, metadata))
+        
+        staging = f"{self.remote_path.rstrip('/')}.upload-{uuid.uuid4().hex[:8]}/"
+        lines = [f"mkdir -p '{staging}' && tar -xzf - -C '{staging}' || {{ rm -rf '{staging}'; exit 1; }}",
+                 "status=0"]
+        for pdf_file, doc_id, metadata in documents:
+            target = f"{self.remote_path}{doc_id}"
+            # xochitl only lists a document once its .metadata exists, so that goes last.
+            # A new document whose metadata did not arrive has its other files removed again.
+            cleanup = "" if doc_id in self.metadata else f"rm -f '{target}.pdf' '{target}.content'; "
+            lines.append(f"{{ mv -f '{staging}{doc_id}.pdf' '{target}.pdf' && "
+                         f"{{ [ -e '{target}.content' ] || mv '{staging}{doc_id}.content' '{target}.content'; }} && "
+                         f"mv -f '{staging}{doc_id}.metadata' '{target}.metadata' && echo '{doc_id}'; }} || "
+                         f"{{ {cleanup}status=1; }}")
+        lines.append(f"rm -rf '{staging}'")
+        lines.append("exit $status")
+        command = '\n'.join(lines)
+        
+        def add(tar, name, f, size):
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            tar.addfile(info, f)
+        
+        def add_json(tar, name, data):
+            data = json.dumps(data).encode()
+            add(tar, name, io.BytesIO(data), len(data))
+        
+        stdin = None
+        try:
+            with metrics.span('upload'):
+                stdin, stdout, stderr = self.ssh.exec_command(command)
+                stream = _CountingWriter(stdin)
+                with tarfile.open(fileobj=stream, mode='w|gz') as tar:
+                    for pdf_file, doc_id, metadata in documents:
+                        with open(pdf_file, 'rb') as f:
+                            add(tar, f"{doc_id}.pdf", f, os.path.getsize(pdf_file))
+                        add_json(tar, f"{doc_id}.content", new_document_content())
+                        add_json(tar, f"{doc_id}.metadata", metadata)
+                stdin.channel.shutdown_write()
+                moved = set(stdout.read().decode('utf-8', 'replace').split())
+                status = stdout.channel.recv_exit_status()
+        except Exception as e:
+            print(f"⚠ Batched upload failed ({e}), uploading files individually")
+            if stdin is not None:
+                # Closing the channel ends the stream early, so tar fails and the staging directory is removed.
+                try:
+                    stdin.channel.close()
+                except Exception:
+                    pass
+            return []
+        
+        metrics.count('upload_bytes', stream.bytes, service='remarkable')
+        with self._bytes_lock:
+            self.bytes_sent += stream.bytes
+        uploaded = []
+        for pdf_file, doc_id, metadata in documents:
+            if doc_id not in moved:
+                continue
+            self._index_entry(doc_id, metadata)
+            self._cache_upload(str(pdf_file))
+            metrics.count('files_uploaded', service='remarkable')
+            print(f"✓ Uploaded {pdf_file.stem}")
+            uploaded.append(pdf_file)
+        
+        if status != 0:
+            error = stderr.read().decode('utf-8', 'replace').strip()
+            print(f"⚠ Batched upload placed {len(uploaded)} of {len(documents)} file(s) "
+                  f"(exit status {status}{': ' + error if error else ''}), uploading the rest individually")
+        return uploaded
+    
+    def _upload_files(self, pdf_files, parent_id, update_existing):
+        """
+        Upload PDFs and return those that succeeded. With batch on, PDFs that cannot be sent
+        as a delta go as one tar stream. With upload_workers > 1, the rest are uploaded in
+        parallel, each worker over its own SFTP channel on the SSH connection. Within a
+        channel, paramiko's put() already pipelines writes.
+        """
+        succeeded = []
+        if self.batch and pdf_files:
+            batched = [pdf_file for pdf_file in pdf_files
+                       if not (update_existing and
+                               self._delta_basis(str(pdf_file), self.find_document(pdf_file.stem, parent_id)))]
+            if batched:
+                succeeded = self._upload_batch(batched, parent_id, update_existing)
+                pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file not in succeeded]
+            if not pdf_files:
+                return succeeded
+        
+        workers = min(self.upload_workers, len(pdf_files))
+        if workers <= 1:
+            return succeeded + [pdf_file for pdf_file in pdf_files
+                                if self.upload_pdf(str(pdf_file), parent_id=parent_id, update_existing=update_existing)]
+        
+        local = threading.local()
+        channels = []
+        channels_lock = threading.Lock()
+        
+        def upload(pdf_file):
+            if not hasattr(local, 'sftp'):
+                try:
+                    local.sftp = self.ssh.open_sftp()
+                except Exception as e:
+                    print(f"✗ Could not open an SFTP channel for {pdf_file.stem}: {e}")
+                    return False
+                with channels_lock:
+                    channels.append(local.sftp)
+            return self.upload_pdf(str(pdf_file), parent_id=parent_id, update_existing=update_existing,
+                                   sftp=local.sftp)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(profiling.thread_target(upload), pdf_files))
+        finally:
+            for channel in channels:
+                channel.close()
+        return succeeded + [pdf_file for pdf_file, ok in zip(pdf_files, results) if ok]
+    
+    def upload_directory(self, directory_path, folder_name=None, update_existing=True, fail_on_error=False,
+                         force=False):
         """
         Upload PDFs in a directory to a folder.
         
@@ -237,6 +612,9 @@ class RemarkableSync:
                         If False, creates new files (duplicates).
         fail_on_error: If True, raises exception on connection failure.
                       If False, logs error and continues (for automated runs).
+        force: If True, upload every PDF. Otherwise PDFs whose content matches the copy on
+              the device (by remote checksum, or by the local sync manifest if the device
+              cannot compute one) are skipped.
         """
         pdf_files = list(Path(directory_path).glob('*.pdf'))
         
@@ -259,12 +637,48 @@ class RemarkableSync:
             else:
                 parent_id = ""
             
-            for pdf_file in pdf_files:
-                self.upload_pdf(str(pdf_file), parent_id=parent_id, update_existing=update_existing)
+            manifest = load_sync_manifest(directory_path)
+            uploaded = manifest.setdefault(self.host, {})
+            if self.delta:
+                self.delta_cache_dir = os.path.join(directory_path, '.sync_cache', self.host)
+                os.makedirs(self.delta_cache_dir, exist_ok=True)
+            
+            with metrics.span('sync'):
+                if update_existing and not force:
+                    pending = self._changed_files(pdf_files, parent_id, uploaded)
+                else:
+                    pending = [(pdf_file, None) for pdf_file in pdf_files]
+                
+                start = time.perf_counter()
+                bytes_before = self.bytes_sent
+                succeeded = self._upload_files([pdf_file for pdf_file, _ in pending], parent_id, update_existing)
+                elapsed = time.perf_counter() - start
+                
+                checksums = dict(pending)
+                for pdf_file in succeeded:
+                    uploaded[pdf_file.name] = {
+                        'sha256': checksums[pdf_file] or file_sha256(pdf_file),
+                        'doc_id': self.find_document(pdf_file.stem, parent_id)
+                    }
             
-            print("\nRestarting reMarkable interface...")
-            self.ssh.exec_command('systemctl restart xochitl')
-            print(f"✓ Upload complete!")
+            if succeeded:
+                total_bytes = self.bytes_sent - bytes_before
+                rate = total_bytes / elapsed if elapsed else 0
+                channels = 1 if self.batch else min(self.upload_workers, len(pending))
+                print(f"Uploaded {len(succeeded)} file(s), {total_bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+                      f"({rate / 1e6:.2f} MB/s, {channels} channel(s))")
+                metrics.record('upload_bytes_per_second', round(rate), service='remarkable')
+            
+            save_sync_manifest(directory_path, manifest)
+            
+            if succeeded:
+                print("\nRestarting reMarkable interface...")
+                self.ssh.exec_command('systemctl restart xochitl')
+                print(f"✓ Upload complete!")
+            elif pending:
+                print("✗ No files were uploaded, interface not restarted")
+            else:
+                print("✓ Everything up to date, nothing uploaded")
             return True
             
         finally:
@@ -283,9 +697,22 @@ def main():
                        help='Create new files instead of updating (creates duplicates)')
     parser.add_argument('--fail-on-error', action='store_true',
                        help='Exit with error if sync fails (default: log and continue)')
+    parser.add_argument('--force', action='store_true',
+                       help='Upload every PDF in a directory, even those unchanged on the device')
+    parser.add_argument('--delta', action='store_true', default=None,
+                       help='Send only the changed blocks of previously uploaded PDFs '
+                            '(or set REMARKABLE_DELTA_SYNC=true)')
+    parser.add_argument('--batch', action='store_true', default=None,
+                       help='Send all changed PDFs as one tar stream over a single SSH command '
+                            '(or set REMARKABLE_BATCH_UPLOAD=true)')
+    parser.add_argument('--workers', type=int,
+                       help='PDFs to upload in parallel over separate SFTP channels '
+                            '(reads from REMARKABLE_UPLOAD_WORKERS env var if not provided, default 1)')
+    profiling.add_arguments(parser)
     
     args = parser.parse_args()
     print(args.path)
+    profiling.enable_from_args(args)
     host = args.host or os.getenv('REMARKABLE_HOST')
     password = args.password or os.getenv('REMARKABLE_PASSWORD')
     
@@ -297,7 +724,8 @@ def main():
         print("Error: Host required. Set REMARKABLE_HOST env var or use --host")
         sys.exit(1)
     
-    sync = RemarkableSync(host=host, password=password)
+    sync = RemarkableSync(host=host, password=password, upload_workers=args.workers, delta=args.delta,
+                          batch=args.batch)
     
     update_existing = not args.new
     
@@ -309,23 +737,29 @@ def main():
                 print("⚠ Sync skipped - device not reachable")
                 sys.exit(0)
         try:
-            parent_id = ""
-            if args.folder:
-                parent_id = sync.get_or_create_folder(args.folder)
-            sync.upload_pdf(args.path, parent_id=parent_id, update_existing=update_existing)
+            with profiling.profile('sync'):
+                parent_id = ""
+                if args.folder:
+                    parent_id = sync.get_or_create_folder(args.folder)
+                sync.upload_pdf(args.path, parent_id=parent_id, update_existing=update_existing)
             sync.ssh.exec_command('systemctl restart xochitl')
         finally:
             sync.disconnect()
     elif os.path.isdir(args.path):
         folder_name = args.folder or Path(args.path).name
-        success = sync.upload_directory(args.path, folder_name=folder_name, 
-                                       update_existing=update_existing,
-                                       fail_on_error=args.fail_on_error)
+        with profiling.profile('sync'):
+            success = sync.upload_directory(args.path, folder_name=folder_name, 
+                                           update_existing=update_existing,
+                                           fail_on_error=args.fail_on_error,
+                                           force=args.force)
         if not success and args.fail_on_error:
             sys.exit(1)
     else:
         print(f"Error: {args.path} not found")
         sys.exit(1)
+    
+    metrics.write_outputs()
+    profiling.write_summary()
 
 
 if __name__ == "__main__":
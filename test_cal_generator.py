@@ -0,0 +1,50 @@
+import os
+
+import benchmark
+import cal_generator
+from cal_generator import load_manifest, month_fingerprint, save_manifest
+from data_processor import PlannerDataProcessor
+
+
+def test_fingerprint_is_stable_and_ignores_key_order():
+    inputs = {'days': {'2026-03-06': ['Dentist']}, 'weeks': {}}
+    reordered = {'weeks': {}, 'days': {'2026-03-06': ['Dentist']}}
+    assert month_fingerprint(2026, 3, inputs) == month_fingerprint(2026, 3, reordered)
+
+
+def test_fingerprint_changes_with_inputs_month_and_layout(monkeypatch):
+    inputs = {'days': {'2026-03-06': ['Dentist']}}
+    fingerprint = month_fingerprint(2026, 3, inputs)
+    assert month_fingerprint(2026, 3, {'days': {'2026-03-06': ['Dentist', 'Gym']}}) != fingerprint
+    assert month_fingerprint(2026, 4, inputs) != fingerprint
+    monkeypatch.setattr(cal_generator, 'LAYOUT_VERSION', cal_generator.LAYOUT_VERSION + 1)
+    assert month_fingerprint(2026, 3, inputs) != fingerprint
+
+
+def test_manifest_round_trip(tmp_path):
+    assert load_manifest(tmp_path) == {}
+    save_manifest(tmp_path, {'2026_03_March.pdf': 'abc'})
+    assert load_manifest(tmp_path) == {'2026_03_March.pdf': 'abc'}
+    (tmp_path / cal_generator.MANIFEST_FILE).write_text('not json')
+    assert load_manifest(tmp_path) == {}
+
+
+def test_unchanged_month_is_not_rendered_again(tmp_path):
+    with benchmark.fake_backends(2026, event_count=200, task_count=50):
+        processor = PlannerDataProcessor()
+        processor.prefetch(2026)
+        fingerprint = cal_generator.generate_monthly_planner(2026, 3, tmp_path, processor)
+        path = tmp_path / '2026_03_March.pdf'
+        os.utime(path, (0, 0))
+
+        manifest = {'2026_03_March.pdf': fingerprint}
+        assert cal_generator.generate_monthly_planner(2026, 3, tmp_path, processor, manifest) == fingerprint
+        assert path.stat().st_mtime == 0
+
+        manifest = {'2026_03_March.pdf': 'stale'}
+        assert cal_generator.generate_monthly_planner(2026, 3, tmp_path, processor, manifest) == fingerprint
+        assert path.stat().st_mtime != 0
+
+        fresh = PlannerDataProcessor()
+        fresh.prefetch(2026)
+        assert cal_generator._build_month_pages(2026, 3, fresh)[1] == fingerprint
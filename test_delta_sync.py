@@ -0,0 +1,98 @@
+import hashlib
+import random
+import shutil
+import subprocess
+
+import pytest
+
+import delta_sync
+from delta_sync import compute_delta, device_script, pack_literals
+
+BLOCK = delta_sync.DELTA_BLOCK_SIZE
+
+
+def _random_bytes(size, seed=0):
+    rnd = random.Random(seed)
+    return bytes(rnd.randrange(256) for _ in range(size))
+
+
+def _apply(old, ops):
+    out = bytearray()
+    for op in ops:
+        if op[0] == 'copy':
+            out += old[op[1] * BLOCK:(op[1] + op[2]) * BLOCK]
+        else:
+            out += op[1]
+    return bytes(out)
+
+
+def test_identical_file_is_all_copies():
+    old = _random_bytes(BLOCK * 20 + 100)
+    ops = compute_delta(old, old)
+    assert _apply(old, ops) == old
+    assert ops[0] == ('copy', 0, 20)
+    assert sum(len(op[1]) for op in ops if op[0] == 'data') == 100
+
+
+def test_insertion_and_deletion_round_trip():
+    old = _random_bytes(BLOCK * 40)
+    new = old[:5000] + b'(Added task) Tj ' * 30 + old[5000:40000] + old[40500:] + b'%%EOF'
+    ops = compute_delta(old, new)
+    assert _apply(old, ops) == new
+    literal = sum(len(op[1]) for op in ops if op[0] == 'data')
+    assert literal < len(new) // 5
+
+
+def test_unrelated_file_is_not_worth_a_delta():
+    old = _random_bytes(BLOCK * 40, seed=1)
+    assert compute_delta(old, _random_bytes(BLOCK * 40, seed=2)) is None
+
+
+def test_mostly_rewritten_file_is_not_worth_a_delta():
+    old = _random_bytes(BLOCK * 40, seed=1)
+    new = old[:BLOCK * 10] + _random_bytes(BLOCK * 30, seed=2)
+    assert compute_delta(old, new) is None
+
+
+def test_pack_literals_offsets():
+    payload, placed = pack_literals([('data', b'ab'), ('copy', 0, 1), ('data', b'cde')])
+    assert payload == b'abcde'
+    assert [offset for _, offset in placed] == [0, None, 2]
+
+
+@pytest.mark.skipif(not all(shutil.which(tool) for tool in ('sh', 'dd', 'sha256sum')),
+                    reason='needs a POSIX shell with dd and sha256sum')
+def test_device_script_rebuilds_file(tmp_path):
+    old = _random_bytes(BLOCK * 30)
+    new = b'%PDF' + old[:20000] + b'changed' * 10 + old[20000:]
+    payload, placed = pack_literals(compute_delta(old, new))
+
+    target = tmp_path / 'doc.pdf'
+    payload_path = tmp_path / 'doc.pdf.delta'
+    target.write_bytes(old)
+    payload_path.write_bytes(payload)
+    script = device_script(placed, target, payload_path, tmp_path / 'doc.pdf.tmp',
+                           hashlib.sha256(new).hexdigest())
+    subprocess.run(['sh'], input=script.encode(), check=True)
+
+    assert target.read_bytes() == new
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['doc.pdf']
+
+
+@pytest.mark.skipif(not all(shutil.which(tool) for tool in ('sh', 'dd', 'sha256sum')),
+                    reason='needs a POSIX shell with dd and sha256sum')
+def test_device_script_keeps_old_file_on_checksum_mismatch(tmp_path):
+    old = _random_bytes(BLOCK * 30)
+    new = old[:20000] + b'changed' + old[20000:]
+    payload, placed = pack_literals(compute_delta(old, new))
+
+    target = tmp_path / 'doc.pdf'
+    payload_path = tmp_path / 'doc.pdf.delta'
+    target.write_bytes(old)
+    payload_path.write_bytes(payload)
+    script = device_script(placed, target, payload_path, tmp_path / 'doc.pdf.tmp', '0' * 64)
+    result = subprocess.run(['sh'], input=script.encode())
+
+    assert result.returncode != 0
+    assert target.read_bytes() == old
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['doc.pdf']
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timedelta, timezone
+
+from models import Event, Task, date_span, parse_iso
+
+
+def test_all_day_event_end_is_exclusive():
+    event = Event.from_api({'id': 'a', 'summary': 'Trip',
+                            'start': {'date': '2026-03-06'}, 'end': {'date': '2026-03-09'}})
+    assert event.is_all_day
+    assert event.dates() == [date(2026, 3, 6), date(2026, 3, 7), date(2026, 3, 8)]
+
+
+def test_timed_event_ending_at_midnight_stays_on_its_day():
+    event = Event.from_api({'id': 'b', 'summary': 'Late',
+                            'start': {'dateTime': '2026-03-06T22:00:00-05:00'},
+                            'end': {'dateTime': '2026-03-07T00:00:00-05:00'}})
+    assert event.dates() == [date(2026, 3, 6)]
+
+
+def test_date_span_never_ends_before_it_starts():
+    event = Event.from_api({'id': 'c', 'summary': 'Zero length',
+                            'start': {'date': '2026-03-06'}, 'end': {'date': '2026-03-06'}})
+    assert date_span(event.start, event.end, event.is_all_day) == (date(2026, 3, 6), date(2026, 3, 6))
+    assert event.dates() == [date(2026, 3, 6)]
+
+
+def test_event_normalizes_label_and_reads_task_link():
+    event = Event.from_api({'id': 'd', 'summary': 'Call the Bank!',
+                            'description': 'https://app.todoist.com/app/task/call-the-bank-6X7rM8997g8PvqHQ @headline',
+                            'start': {'date': '2026-03-06'}, 'end': {'date': '2026-03-07'}})
+    assert event.normalized_label == 'call the bank'
+    assert event.task_id == '6X7rM8997g8PvqHQ'
+    assert event.is_headline
+    assert event.calendar_id == 'primary'
+
+
+def test_task_without_due_date_is_skipped():
+    assert Task.from_api({'id': '1', 'content': 'Someday'}) is None
+
+
+def test_task_fields():
+    task = Task.from_api({'id': 123, 'v2_id': '6X7rM8997g8PvqHQ', 'content': 'Call the bank',
+                          'labels': ['errand', '15min', 'Headline'], 'due': {'date': '2026-03-06'}})
+    assert task.due_date == date(2026, 3, 6)
+    assert task.text == 'Call the bank @15min @errand @Headline'
+    assert task.is_headline
+    assert task.link_ids == ('123', '6X7rM8997g8PvqHQ')
+
+
+def test_parse_iso_reads_trailing_z_as_utc():
+    parsed = parse_iso('2026-03-06T14:30:00Z')
+    assert parsed == datetime(2026, 3, 6, 14, 30, tzinfo=timezone.utc)
+    assert parsed.utcoffset() == timedelta(0)
+
+
+def test_parse_iso_keeps_offsets():
+    parsed = parse_iso('2026-03-06T09:30:00-05:00')
+    assert parsed.utcoffset() == timedelta(hours=-5)
+    assert parsed.astimezone(timezone.utc) == datetime(2026, 3, 6, 14, 30, tzinfo=timezone.utc)
+
+
+def test_parse_iso_dates_and_fractional_seconds():
+    assert parse_iso('2026-03-06') == datetime(2026, 3, 6)
+    assert parse_iso('2026-03-06T14:30:00.123456Z').microsecond == 123456
+
+
+def test_parse_iso_falls_back_to_dateutil():
+    assert parse_iso('March 6 2026 2:30 PM') == datetime(2026, 3, 6, 14, 30)
+
+
+def test_parse_iso_is_memoized():
+    assert parse_iso('2026-03-07T08:00:00Z') is parse_iso('2026-03-07T08:00:00Z')
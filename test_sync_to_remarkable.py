@@ -0,0 +1,129 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from sync_to_remarkable import RemarkableSync
+
+pytestmark = pytest.mark.skipif(not all(shutil.which(tool) for tool in ('sh', 'tar')),
+                                reason='needs a POSIX shell with tar')
+
+
+class _Process:
+    """Stands in for the stdin/stdout/stderr files and channel paramiko returns."""
+    def __init__(self, proc, stream):
+        self.proc = proc
+        self.stream = stream
+        self.channel = self
+
+    def write(self, data):
+        self.proc.stdin.write(data)
+
+    def read(self):
+        return self.stream.read()
+
+    def shutdown_write(self):
+        self.proc.stdin.close()
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+    def recv_exit_status(self):
+        return self.proc.wait()
+
+
+class LocalSSH:
+    """Runs commands with the local shell; `replace` rewrites them first to inject failures."""
+    def __init__(self, replace=None):
+        self.replace = replace or {}
+
+    def exec_command(self, command):
+        for old, new in self.replace.items():
+            command = command.replace(old, new)
+        proc = subprocess.Popen(['sh', '-c', command], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return _Process(proc, None), _Process(proc, proc.stdout), _Process(proc, proc.stderr)
+
+
+def _sync(tmp_path, ssh):
+    remote = tmp_path / 'xochitl'
+    remote.mkdir()
+    sync = RemarkableSync(host='test', password='test', batch=True)
+    sync.ssh = ssh
+    sync.remote_path = f"{remote}/"
+    sync.metadata = {}
+    sync.index = {}
+    return sync, remote
+
+
+def _pdfs(tmp_path, *names):
+    local = tmp_path / 'planner'
+    local.mkdir()
+    for name in names:
+        (local / f"{name}.pdf").write_bytes(b'%PDF-1.4 ' + name.encode() * 1000)
+    return [local / f"{name}.pdf" for name in names]
+
+
+def _existing(sync, remote, doc_id, name):
+    metadata = {'visibleName': name, 'parent': '', 'type': 'DocumentType', 'deleted': False}
+    (remote / f"{doc_id}.metadata").write_text(json.dumps(metadata))
+    (remote / f"{doc_id}.content").write_text('{"pageCount": 3}')
+    (remote / f"{doc_id}.pdf").write_bytes(b'old')
+    sync._index_entry(doc_id, metadata)
+
+
+def test_batch_places_documents_and_keeps_existing_content(tmp_path):
+    sync, remote = _sync(tmp_path, LocalSSH())
+    _existing(sync, remote, 'existing-doc', 'January')
+    pdfs = _pdfs(tmp_path, 'January', 'February')
+
+    assert sync._upload_batch(pdfs, '', True) == pdfs
+
+    assert (remote / 'existing-doc.pdf').read_bytes() == pdfs[0].read_bytes()
+    assert (remote / 'existing-doc.content').read_text() == '{"pageCount": 3}'
+    assert json.loads((remote / 'existing-doc.metadata').read_text())['modified'] is True
+
+    new_id = sync.find_document('February')
+    assert (remote / f"{new_id}.pdf").read_bytes() == pdfs[1].read_bytes()
+    assert json.loads((remote / f"{new_id}.content").read_text())['fileType'] == 'pdf'
+    assert json.loads((remote / f"{new_id}.metadata").read_text())['visibleName'] == 'February'
+    assert [path.name for path in tmp_path.iterdir() if '.upload-' in path.name] == []
+    assert sync.bytes_sent > 0
+
+
+def test_batch_reports_only_documents_that_were_placed(tmp_path):
+    sync, remote = _sync(tmp_path, None)
+    _existing(sync, remote, 'existing-doc', 'January')
+    sync.ssh = LocalSSH({f"'{remote}/existing-doc.metadata' && echo": "'/nonexistent/dir/x' && echo"})
+    pdfs = _pdfs(tmp_path, 'January', 'February')
+
+    assert sync._upload_batch(pdfs, '', True) == pdfs[1:]
+
+    assert (remote / 'existing-doc.metadata').exists()
+    assert sync.find_document('February') is not None
+    assert [path.name for path in tmp_path.iterdir() if '.upload-' in path.name] == []
+
+
+def test_failed_new_document_leaves_no_files(tmp_path):
+    sync, remote = _sync(tmp_path, None)
+    sync.ssh = LocalSSH({".metadata' && echo": ".metadata' '/nonexistent/dir/x' && echo"})
+    pdfs = _pdfs(tmp_path, 'March')
+
+    assert sync._upload_batch(pdfs, '', True) == []
+
+    assert list(remote.iterdir()) == []
+    assert sync.find_document('March') is None
+
+
+def test_broken_stream_changes_nothing(tmp_path):
+    sync, remote = _sync(tmp_path, LocalSSH())
+    _existing(sync, remote, 'existing-doc', 'January')
+    pdfs = _pdfs(tmp_path, 'January')
+    pdfs[0].unlink()
+
+    assert sync._upload_batch(pdfs, '', True) == []
+
+    assert (remote / 'existing-doc.pdf').read_bytes() == b'old'
+    assert [path.name for path in tmp_path.iterdir() if '.upload-' in path.name] == []